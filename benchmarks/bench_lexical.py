@@ -0,0 +1,89 @@
+"""Measure the BM25 index: build, save and reload time, and query latency.
+
+Usage:
+    python benchmarks/bench_lexical.py --products 100000 --k 100
+
+The catalog is synthetic (see x_qb_mistral_hackathon.synthetic_catalog) and
+indexed with the same text as RAGEngine. Queries are the chatbot's usual
+"Cadeau pour quelqu'un qui aime <sous-catégorie>" plus product names.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from x_qb_mistral_hackathon.data_loader import DataLoader
+from x_qb_mistral_hackathon.lexical import BM25Index
+from x_qb_mistral_hackathon.synthetic_catalog import iter_catalog
+
+def _percentiles(values) -> dict:
+    values = np.asarray(values) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--k', type=int, default=100, help="results per query (RAGEngine asks for 5 x candidates)")
+    parser.add_argument('--names', type=int, default=200, help="product names used as queries")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = pd.concat([DataLoader._normalize(chunk) for chunk in iter_catalog(args.products, args.seed)],
+                   ignore_index=True)
+    texts = (df['name'].astype(str) + ' ' + df['sub_category'].astype(str)
+             + ' ' + df['rich_description'].astype(str)).tolist()
+    rng = np.random.default_rng(args.seed)
+    queries = [f"Cadeau pour quelqu'un qui aime {sub}" for sub in df['sub_category'].astype(str).unique()]
+    queries += df['name'].iloc[rng.integers(len(df), size=args.names)].astype(str).tolist()
+
+    index = BM25Index()
+    start = time.perf_counter()
+    for product_id, text in enumerate(texts):
+        index.add(str(product_id), text)
+    build_seconds = time.perf_counter() - start
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        timings.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'bm25.json')
+        start = time.perf_counter()
+        index.save(path)
+        save_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+
+        start = time.perf_counter()
+        reloaded = BM25Index.load(path)
+        load_seconds = time.perf_counter() - start
+
+    # What a restart costs on an unchanged catalog: reload, then skip every unchanged text
+    start = time.perf_counter()
+    for product_id, text in enumerate(texts):
+        reloaded.add(str(product_id), text)
+    recheck_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'products': args.products,
+        'queries': len(queries),
+        'k': args.k,
+        'build_seconds': build_seconds,
+        'save_seconds': save_seconds,
+        'load_seconds': load_seconds,
+        'recheck_seconds': recheck_seconds,
+        'file_mb': size_mb,
+        'query_latency': _percentiles(timings)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
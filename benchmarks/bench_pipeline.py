@@ -0,0 +1,243 @@
+"""Benchmark the retrieval and recommendation hot paths on synthetic catalogs.
+
+Usage:
+    python benchmarks/bench_pipeline.py run --sizes 1000 100000 1000000 --output bench.json
+    python benchmarks/bench_pipeline.py compare baseline.json bench.json --threshold 0.10
+
+Stages measured for each catalog size, each size in its own subprocess so
+that peak RSS is isolated:
+  - load:   DataLoader.load_amazon_dataset, cold (CSV) and warm (columnar cache)
+  - index:  RAGEngine.index_products from an empty index
+  - search: find_similar_products latency (p50/p95/p99), queries/sec, with and without filters
+  - chat:   GiftChatbot.get_response end to end, with a stubbed Mistral client
+
+By default embeddings come from a hashed bag-of-words encoder so that large
+catalogs can be indexed in reasonable time; `--embeddings model` uses the
+configured SentenceTransformer instead. The `compare` subcommand diffs two
+result files and exits 1 when a metric regresses by more than the threshold.
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from x_qb_mistral_hackathon.chatbot import GiftChatbot
+from x_qb_mistral_hackathon.data_loader import DataLoader
+from x_qb_mistral_hackathon.rag_engine import RAGEngine
+from x_qb_mistral_hackathon.synthetic_catalog import write_catalog
+
+INTERESTS = ['la cuisine', 'la randonnée', 'la musique', 'les jeux vidéo', 'le yoga', 'les livres',
+             'le café', 'la photo', 'les voyages', 'le vélo', 'la décoration', 'le spa']
+
+# Metrics where a higher value is better (all others: lower is better)
+HIGHER_IS_BETTER = ('qps', 'products_per_second')
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _latency_stats(timings) -> dict:
+    timings = np.asarray(timings) * 1000
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'qps': float(len(timings) / (timings.sum() / 1000))
+    }
+
+class HashingEmbedder:
+    """Deterministic bag-of-words encoder: measures the pipeline, not the model."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _token_index(self, token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little') % self.dim
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                embeddings[row, self._token_index(token)] += 1.0
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+class StubMistralClient:
+    """Answers like Mistral without the network: preferences JSON or a canned reply."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.chat = SimpleNamespace(complete=self.complete)
+
+    def complete(self, model, messages, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        last_user = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), '')
+        preferences = {'description': 'un ami', 'interests': last_user[-40:]}
+        if kwargs.get('response_format'):
+            content = json.dumps({'reply': 'Voici quelques idées.', 'preferences': preferences})
+        elif messages[0]['content'].startswith('Analyse la conversation'):
+            content = json.dumps(preferences)
+        else:
+            content = 'Voici quatre idées de cadeaux adaptées.'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def run_size(args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    result = {'products': args.products, 'backend': args.backend, 'embeddings': args.embeddings}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, 'catalog.csv')
+        write_catalog(csv_path, args.products, args.seed)
+
+        # Load: CSV parse and normalization, then the columnar cache written by the first load
+        loader = DataLoader(csv_path)
+        start = time.perf_counter()
+        df = loader.load_amazon_dataset()
+        cold_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        df = DataLoader(csv_path).load_amazon_dataset()
+        result['load'] = {
+            'cold_seconds': cold_seconds,
+            'warm_seconds': time.perf_counter() - start,
+            'peak_rss_mb': _peak_rss_mb()
+        }
+
+        # Index from an empty store
+        rag_engine = RAGEngine(backend=args.backend, persist_directory=os.path.join(workdir, 'index'))
+        if args.embeddings == 'stub':
+            rag_engine._embedding_model = HashingEmbedder()
+        start = time.perf_counter()
+        rag_engine.index_products(df)
+        index_seconds = time.perf_counter() - start
+        result['index'] = {
+            'seconds': index_seconds,
+            'products_per_second': len(df) / index_seconds,
+            'peak_rss_mb': _peak_rss_mb()
+        }
+
+        # Search: distinct queries so that the result cache is not hit
+        queries = [
+            f"Cadeau pour un ami qui aime {INTERESTS[i % len(INTERESTS)]} {i}"
+            for i in range(args.queries)
+        ]
+        rag_engine.warm_up()
+        search = {}
+        for label, filters in (('unfiltered', {}),
+                               ('filtered', {'price_max': 50.0, 'main_categories': ['Books', 'Sports & Fitness']})):
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                rag_engine.find_similar_products(f"{query} {label}", **filters)
+                timings.append(time.perf_counter() - start)
+            search[label] = _latency_stats(timings)
+        search['peak_rss_mb'] = _peak_rss_mb()
+        result['search'] = search
+
+        # End-to-end chatbot turn with the LLM stubbed out
+        timings = []
+        for i in range(args.chat_turns):
+            chatbot = GiftChatbot(use_llm_cache=False)
+            chatbot.client = StubMistralClient(args.llm_latency_ms)
+            chatbot.set_rag_engine(rag_engine)
+            messages = [
+                {'role': 'system', 'content': chatbot.system_prompt},
+                {'role': 'user', 'content': f"Un cadeau pour un ami qui aime {INTERESTS[rng.integers(len(INTERESTS))]} {i}"}
+            ]
+            start = time.perf_counter()
+            chatbot.get_response(messages)
+            timings.append(time.perf_counter() - start)
+        result['chat'] = dict(_latency_stats(timings), llm_latency_ms=args.llm_latency_ms)
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+def _flatten(result: dict, prefix: str = '') -> dict:
+    metrics = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(_flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    """Print per-metric changes between two result files; 1 if any metric regressed."""
+    with open(baseline_path) as f:
+        baseline = {r['products']: _flatten(r) for r in json.load(f)['results']}
+    with open(current_path) as f:
+        current = {r['products']: _flatten(r) for r in json.load(f)['results']}
+
+    regressions = 0
+    for products in sorted(baseline.keys() & current.keys()):
+        print(f"\n{products} products")
+        for name, old in baseline[products].items():
+            new = current[products].get(name)
+            if new is None or name == 'products' or name.endswith('latency_ms') or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if name.rsplit('.', 1)[-1] in HIGHER_IS_BETTER else change
+            flag = 'REGRESSION' if worse > threshold else ''
+            regressions += bool(flag)
+            print(f"  {name:40s} {old:12.3f} -> {new:12.3f} ({change:+7.1%}) {flag}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="run the benchmark")
+    run.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000])
+    run.add_argument('--backend', choices=['chroma', 'numpy'], default='numpy')
+    run.add_argument('--embeddings', choices=['stub', 'model'], default='stub')
+    run.add_argument('--queries', type=int, default=200)
+    run.add_argument('--chat-turns', type=int, default=50)
+    run.add_argument('--llm-latency-ms', type=float, default=0.0,
+                     help="simulated latency of each stubbed Mistral call")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--output', default=None, help="write the results as JSON to this file")
+    # Internal: run a single size in this process
+    run.add_argument('--products', type=int, default=None, help=argparse.SUPPRESS)
+
+    diff = subparsers.add_parser('compare', help="compare two result files")
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=0.10,
+                      help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        sys.exit(compare(args.baseline, args.current, args.threshold))
+
+    if args.products is not None:
+        print(json.dumps(run_size(args)))
+        return
+
+    results = []
+    for size in args.sizes:
+        command = [sys.executable, __file__, 'run', '--products', str(size),
+                   '--backend', args.backend, '--embeddings', args.embeddings,
+                   '--queries', str(args.queries), '--chat-turns', str(args.chat_turns),
+                   '--llm-latency-ms', str(args.llm_latency_ms), '--seed', str(args.seed)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+        print(json.dumps(results[-1], indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Compare the Chroma and NumPy vector backends on query latency and memory.
+
+Usage:
+    python benchmarks/bench_vector_store.py --products 100000 --queries 500
+
+Each backend runs in its own subprocess so that peak RSS is measured in isolation.
+Embeddings are random unit vectors: the benchmark measures the index, not the model.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from x_qb_mistral_hackathon.vector_store import create_vector_store
+
+CATEGORIES = ['Books', 'Electronics', 'Home & Kitchen', 'Jewelry', 'Garden', 'Toys & Games']
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _percentile(values, q) -> float:
+    return float(np.percentile(values, q)) * 1000
+
+def run_backend(backend: str, args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    embeddings = rng.standard_normal((args.products, args.dim), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    ids = [f"p{i}" for i in range(args.products)]
+    metadatas = [
+        {
+            'content_hash': str(i),
+            'name': f"Produit {i}",
+            'gift_category': CATEGORIES[i % len(CATEGORIES)],
+            'rich_description': '',
+            'discount_price': float(rng.uniform(5, 500)),
+            'ratings': float(rng.uniform(3.5, 5)),
+            'main_category': CATEGORIES[i % len(CATEGORIES)],
+            'sub_category': f"Sous-catégorie {i % 40}"
+        }
+        for i in range(args.products)
+    ]
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    rss_before = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as path:
+        store = create_vector_store(backend, path, dtype=args.dtype)
+
+        start = time.perf_counter()
+        store.add(ids, embeddings, [''] * args.products, metadatas)
+        store.persist()
+        build_seconds = time.perf_counter() - start
+        del embeddings, metadatas
+
+        latencies = {}
+        for label, filters in (('unfiltered', None),
+                               ('filtered', {'price_max': 50.0, 'main_categories': ['Books']})):
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                store.query(query[None, :], args.k, filters)
+                timings.append(time.perf_counter() - start)
+            latencies[label] = {
+                'p50_ms': _percentile(timings, 50),
+                'p95_ms': _percentile(timings, 95),
+                'p99_ms': _percentile(timings, 99)
+            }
+
+        start = time.perf_counter()
+        for batch in range(0, len(queries), args.batch_size):
+            store.query(queries[batch:batch + args.batch_size], args.k)
+        batched_qps = len(queries) / (time.perf_counter() - start)
+
+    return {
+        'backend': backend,
+        'dtype': args.dtype if backend == 'numpy' else None,
+        'products': args.products,
+        'dim': args.dim,
+        'build_seconds': build_seconds,
+        'latency': latencies,
+        'batched_qps': batched_qps,
+        'peak_rss_mb': _peak_rss_mb(),
+        'rss_growth_mb': _peak_rss_mb() - rss_before
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=['chroma', 'numpy', 'all'], default='all')
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.backend != 'all':
+        print(json.dumps(run_backend(args.backend, args)))
+        return
+
+    for backend in ('chroma', 'numpy'):
+        command = [sys.executable, __file__, '--backend', backend] + [
+            arg for arg in sys.argv[1:] if arg not in ('--backend', 'all')
+        ]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Summarize `python -X importtime` per module to track startup-time regressions.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py x_qb_mistral_hackathon.rag_engine --top 15 --json
+    python benchmarks/import_time.py --max-ms 300   # exits 1 above the budget
+
+Each module is imported in a fresh interpreter. The report lists the total
+import time, the slowest modules by cumulative time and the time spent per
+top-level package (self time, so nested imports are not counted twice).
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+DEFAULT_MODULES = [
+    'x_qb_mistral_hackathon',
+    'x_qb_mistral_hackathon.chatbot',
+    'x_qb_mistral_hackathon.rag_engine',
+    'x_qb_mistral_hackathon.data_loader'
+]
+
+def import_times(module: str) -> List[dict]:
+    """Run `python -X importtime -c 'import module'` and parse its report (times in ms)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+    return entries
+
+def summarize(module: str, top: int) -> Dict:
+    entries = import_times(module)
+    target = next(e for e in reversed(entries) if e['module'] == module)
+    per_package = defaultdict(float)
+    for entry in entries:
+        per_package[entry['module'].split('.')[0]] += entry['self_ms']
+
+    return {
+        'module': module,
+        'total_ms': round(target['cumulative_ms'], 1),
+        'modules_imported': len(entries),
+        'slowest_modules': [
+            {'module': e['module'], 'cumulative_ms': round(e['cumulative_ms'], 1)}
+            for e in sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:top]
+        ],
+        'per_package_ms': {
+            name: round(ms, 1)
+            for name, ms in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        }
+    }
+
+def print_report(summary: Dict):
+    print(f"\n{summary['module']}: {summary['total_ms']:.1f} ms "
+          f"({summary['modules_imported']} modules)")
+    print("  slowest modules (cumulative):")
+    for entry in summary['slowest_modules']:
+        print(f"    {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+    print("  per top-level package (self):")
+    for name, ms in summary['per_package_ms'].items():
+        print(f"    {ms:9.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help="print the summaries as JSON")
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help="fail if any module takes longer than this to import")
+    args = parser.parse_args()
+
+    summaries = [summarize(module, args.top) for module in args.modules]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        for summary in summaries:
+            print_report(summary)
+
+    if args.max_ms is not None:
+        slow = [s['module'] for s in summaries if s['total_ms'] > args.max_ms]
+        if slow:
+            print(f"\nImport time above {args.max_ms} ms: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""Replay recorded conversations as concurrent synthetic users.
+
+Usage:
+    RECORD_CONVERSATIONS=true streamlit run main.py     # record real sessions first
+    python benchmarks/replay_conversations.py data/conversations.jsonl \\
+        --users 200 --rate 5 --concurrency 32 --fake-server --output replay.json
+
+Each synthetic user replays one recorded session, turn by turn, through its
+own GiftChatbot (the headless equivalent of a Streamlit session) against a
+shared RAGEngine. Users arrive as a Poisson process at `--rate` users/second
+and run on a pool of `--concurrency` threads; when there are more users than
+recorded sessions, sessions are reused in turn.
+
+The report gives throughput, turn latency and per-stage latency percentiles
+(extraction, retrieval, generation), the time users waited for a free worker,
+and how many turns retrieved different products than when recorded, so that
+performance and ranking regressions show up in the same run.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from x_qb_mistral_hackathon.chatbot import GiftChatbot
+from x_qb_mistral_hackathon.config import MISTRAL_SERVER_URL, VECTOR_BACKEND
+from x_qb_mistral_hackathon.conversation_recorder import load_sessions
+from x_qb_mistral_hackathon.data_loader import DataLoader
+from x_qb_mistral_hackathon.rag_engine import CATALOG_COLUMNS, RAGEngine
+
+STAGES = ('extraction', 'retrieval', 'generation')
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {}
+    values = np.asarray(values) * 1000
+    return {
+        'count': int(len(values)),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99))
+    }
+
+def _jaccard(a, b) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+def build_rag_engine(args, workdir: str) -> RAGEngine:
+    df = DataLoader(args.data_path).load_amazon_dataset(columns=CATALOG_COLUMNS)
+    if df is None:
+        raise SystemExit("Failed to load the catalog")
+    # Never index into the production persist directory: a different catalog
+    # would delete and re-embed its products
+    persist_directory = args.persist_dir or os.path.join(workdir, 'index')
+    rag_engine = RAGEngine(backend=args.backend, persist_directory=persist_directory)
+    if args.embeddings == 'stub':
+        from bench_pipeline import HashingEmbedder
+        rag_engine._embedding_model = HashingEmbedder()
+    rag_engine.index_products(df)
+    rag_engine.warm_up()
+    return rag_engine
+
+class Replay:
+    """Collects per-turn measurements from the worker threads."""
+
+    def __init__(self, rag_engine: RAGEngine, server_url: str, stream: bool):
+        self.rag_engine = rag_engine
+        self.server_url = server_url
+        self.stream = stream
+        self.turns = []
+        self.queue_delays = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _new_chatbot(self) -> GiftChatbot:
+        chatbot = GiftChatbot(use_llm_cache=False)
+        if self.server_url:
+            from mistralai import Mistral
+            chatbot.client = Mistral(api_key=os.getenv('MISTRAL_API_KEY') or 'replay',
+                                     server_url=self.server_url)
+        chatbot.set_rag_engine(self.rag_engine)
+        return chatbot
+
+    def run_user(self, session: list, scheduled_at: float):
+        started = time.perf_counter()
+        chatbot = self._new_chatbot()
+        messages = [{'role': 'system', 'content': chatbot.system_prompt}]
+        measurements = []
+        errors = 0
+        for recorded in session:
+            messages.append({'role': 'user', 'content': recorded['user_message']})
+            turn_started = time.perf_counter()
+            if self.stream:
+                response = ''.join(chatbot.get_response_stream(messages, recorded.get('filters') or None,
+                                                               use_cache=False))
+            else:
+                response = chatbot.get_response(messages, recorded.get('filters') or None, use_cache=False)
+            latency = time.perf_counter() - turn_started
+            if response.startswith("Erreur avec l'API Mistral"):
+                errors += 1
+            messages.append({'role': 'assistant', 'content': response})
+
+            product_ids = [str(p['id']) for p in chatbot.last_recommendations]
+            measurements.append({
+                'latency': latency,
+                'time_to_first_token': chatbot.last_time_to_first_token,
+                'timings': dict(chatbot.last_timings),
+                'changed': product_ids != recorded['product_ids'],
+                'overlap': _jaccard(product_ids, recorded['product_ids'])
+            })
+        with self._lock:
+            self.queue_delays.append(started - scheduled_at)
+            self.turns.extend(measurements)
+            self.errors += errors
+
+    def report(self, wall_seconds: float, users: int) -> dict:
+        stages = {
+            stage: _percentiles([t['timings'][stage] for t in self.turns if stage in t['timings']])
+            for stage in STAGES
+        }
+        report = {
+            'users': users,
+            'turns': len(self.turns),
+            'errors': self.errors,
+            'wall_seconds': wall_seconds,
+            'turns_per_second': len(self.turns) / wall_seconds if wall_seconds else 0.0,
+            'turn_latency': _percentiles([t['latency'] for t in self.turns]),
+            'stages': stages,
+            'queue_delay': _percentiles(self.queue_delays),
+            'products_changed_rate': (
+                float(np.mean([t['changed'] for t in self.turns])) if self.turns else 0.0
+            ),
+            'mean_product_overlap': (
+                float(np.mean([t['overlap'] for t in self.turns])) if self.turns else 1.0
+            )
+        }
+        if self.stream:
+            report['time_to_first_token'] = _percentiles(
+                [t['time_to_first_token'] for t in self.turns if t['time_to_first_token'] is not None]
+            )
+        return report
+
+def print_report(report: dict):
+    print(f"\n{report['users']} users, {report['turns']} turns, {report['errors']} errors "
+          f"in {report['wall_seconds']:.1f}s ({report['turns_per_second']:.2f} turns/s)")
+    rows = [('turn', report['turn_latency']), ('queue delay', report['queue_delay'])]
+    rows += [(stage, stats) for stage, stats in report['stages'].items()]
+    if 'time_to_first_token' in report:
+        rows.append(('first token', report['time_to_first_token']))
+    for name, stats in rows:
+        if stats:
+            print(f"  {name:12s} p50 {stats['p50_ms']:9.1f} ms  p95 {stats['p95_ms']:9.1f} ms  "
+                  f"p99 {stats['p99_ms']:9.1f} ms")
+    print(f"  retrieved products changed on {report['products_changed_rate']:.1%} of turns "
+          f"(mean overlap {report['mean_product_overlap']:.2f})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help="conversation log written with RECORD_CONVERSATIONS=true")
+    parser.add_argument('--users', type=int, default=None,
+                        help="synthetic users to run (default: one per recorded session)")
+    parser.add_argument('--rate', type=float, default=2.0, help="mean user arrivals per second")
+    parser.add_argument('--concurrency', type=int, default=16, help="users served at the same time")
+    parser.add_argument('--stream', action='store_true', help="use get_response_stream (records first-token time)")
+    parser.add_argument('--data-path', default=None, help="catalog to index (default: GIFTS_DATA_PATH)")
+    parser.add_argument('--backend', choices=['chroma', 'numpy'], default=VECTOR_BACKEND)
+    parser.add_argument('--embeddings', choices=['stub', 'model'], default='model')
+    parser.add_argument('--persist-dir', default=None,
+                        help="index directory to build or reuse (default: a temporary directory)")
+    parser.add_argument('--fake-server', action='store_true',
+                        help="serve Mistral from an in-process fake server instead of MISTRAL_SERVER_URL")
+    parser.add_argument('--llm-latency-ms', type=float, default=300.0, help="fake server median latency")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    sessions = list(load_sessions(args.log).values())
+    if not sessions:
+        raise SystemExit(f"No recorded turns in {args.log}")
+    users = args.users or len(sessions)
+
+    server = None
+    server_url = MISTRAL_SERVER_URL
+    if args.fake_server:
+        from x_qb_mistral_hackathon.fake_mistral_server import FakeMistralConfig, FakeMistralServer
+        server = FakeMistralServer(port=0, config=FakeMistralConfig(args.llm_latency_ms, seed=args.seed)).start()
+        server_url = server.url
+
+    rng = np.random.default_rng(args.seed)
+    arrivals = np.cumsum(rng.exponential(1 / args.rate, users)) if args.rate > 0 else np.zeros(users)
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            replay = Replay(build_rag_engine(args, workdir), server_url, args.stream)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                futures = []
+                for user, arrival in enumerate(arrivals):
+                    delay = start + arrival - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    futures.append(executor.submit(replay.run_user, sessions[user % len(sessions)],
+                                                   start + arrival))
+                for future in futures:
+                    future.result()
+            report = replay.report(time.perf_counter() - start, users)
+        if server is not None:
+            report['fake_server'] = server.stats()
+    finally:
+        if server is not None:
+            server.stop()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(report, created_at=time.strftime('%Y-%m-%dT%H:%M:%S'), log=args.log), f, indent=2)
+
+if __name__ == '__main__':
+    main()
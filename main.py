@@ -1,65 +1,82 @@
 import streamlit as st
 import uuid
-import logging.config
+import logging
 import os
 from x_qb_mistral_hackathon.chatbot import GiftChatbot
-from x_qb_mistral_hackathon.storage import DataStorage
+from x_qb_mistral_hackathon.async_chatbot import AsyncGiftChatbot
+from x_qb_mistral_hackathon.storage import BufferedDataStorage, DataStorage
 from x_qb_mistral_hackathon.ui import UI
-from x_qb_mistral_hackathon.config import LOGGING_CONFIG
+from x_qb_mistral_hackathon.wishlist import format_wishlist_item, get_default_wishlist_store
+from x_qb_mistral_hackathon.config import CHATBOT_ASYNC, RECORD_CONVERSATIONS, STORAGE_WRITE_BEHIND
+from x_qb_mistral_hackathon.conversation_recorder import get_default_recorder
 from x_qb_mistral_hackathon.data_loader import DataLoader
-from x_qb_mistral_hackathon.rag_engine import RAGEngine
+from x_qb_mistral_hackathon.rag_engine import CATALOG_COLUMNS, RAGEngine
+from x_qb_mistral_hackathon.write_behind import configure_logging
 
-# Setup logging
-logging.config.dictConfig(LOGGING_CONFIG)
+# Setup logging (file and console handlers run on a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-def initialize_rag_components():
-    """Initialize RAG system and chatbot with enhanced error handling."""
-    try:
-        with st.spinner('Chargement de la base de données des produits...'):
-            # Initialize data loader with debug info
-            logger.info("Starting RAG components initialization")
-            data_loader = DataLoader()
+@st.cache_resource(show_spinner=False)
+def load_shared_components():
+    """Load the catalog, embedding model and product index once per server process.
 
-            # Try to get the current working directory and list files
-            cwd = os.getcwd()
-            logger.info(f"Current working directory: {cwd}")
-            logger.info(f"Directory contents: {os.listdir(cwd)}")
+    The returned objects are shared read-only by every Streamlit session.
+    Raising on failure keeps the error out of the cache so the next session retries.
+    """
+    logger.info("Starting shared RAG components initialization")
+    data_loader = DataLoader()
 
-            # Load the data
-            gift_data = data_loader.load_amazon_dataset()
+    # Try to get the current working directory and list files
+    cwd = os.getcwd()
+    logger.info(f"Current working directory: {cwd}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Directory contents: {os.listdir(cwd)}")
 
-            if gift_data is None:
-                logger.error("Failed to load dataset")
-                st.error("Erreur: Impossible de charger la base de données des produits.")
-                return None, None
+    # Categories and price range (on the first run, this also builds the
+    # columnar cache the catalog chunks are then read from)
+    categories = data_loader.get_categories()
+    price_range = data_loader.get_price_range()
+    if data_loader.catalog_stats is None:
+        raise RuntimeError("Failed to load dataset")
 
-            logger.info(f"Successfully loaded {len(gift_data)} products")
+    logger.info(f"Successfully loaded {data_loader.catalog_stats['n_products']} products")
 
-            # Initialize RAG engine with progress feedback
-            rag_engine = RAGEngine()
+    # Index the catalog chunk by chunk, then warm up before the first query
+    rag_engine = RAGEngine()
+    if not rag_engine.index_catalog(data_loader.iter_catalog_chunks(columns=CATALOG_COLUMNS)):
+        raise RuntimeError("Failed to index products")
+    rag_engine.warm_up()
 
-            with st.spinner('Indexation des produits...'):
-                if not rag_engine.index_products(gift_data):
-                    logger.error("Failed to index products")
-                    st.error("Erreur: Échec de l'indexation des produits.")
-                    return None, None
+    logger.info("Successfully indexed products")
 
-            logger.info("Successfully indexed products")
+    return data_loader, rag_engine, categories, price_range
 
-            # Initialize Chatbot
-            chatbot = GiftChatbot()
-            chatbot.set_rag_engine(rag_engine)
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    """Recommendation storage shared by every session of the server process.
+
+    With STORAGE_WRITE_BEHIND, rows are written in batches by a background
+    thread so that saving never blocks a chat turn.
+    """
+    return BufferedDataStorage() if STORAGE_WRITE_BEHIND else DataStorage()
+
+def initialize_rag_components():
+    """Initialize RAG system and chatbot with enhanced error handling."""
+    try:
+        with st.spinner('Chargement de la base de données des produits...'):
+            data_loader, rag_engine, categories, price_range = load_shared_components()
 
-            # Store categories and price range
-            categories = data_loader.get_categories()
-            price_range = data_loader.get_price_range()
+            # Initialize Chatbot (per session)
+            chatbot = AsyncGiftChatbot() if CHATBOT_ASYNC else GiftChatbot()
+            chatbot.set_rag_engine(rag_engine)
 
             if categories['main_categories']:
                 st.session_state.categories = categories
                 logger.info(f"Loaded categories: {len(categories['main_categories'])} main categories")
 
             if price_range != (0.0, 1000000.0):
+                st.session_state.catalog_price_range = price_range
                 st.session_state.price_range = price_range
                 logger.info(f"Loaded price range: {price_range}")
 
@@ -73,23 +90,92 @@ def initialize_rag_components():
         """)
         return None, None
 
+def get_user_id():
+    """Stable id of the visitor, kept in the page URL (?uid=...).
+
+    Reloading or bookmarking the page keeps the same wishlist. Another browser,
+    or a link without the parameter, starts a new one, and anyone with the
+    link sees the list: this is not an account.
+    """
+    try:
+        return str(uuid.UUID(st.query_params.get('uid', '')))
+    except ValueError:
+        user_id = str(uuid.uuid4())
+        st.query_params['uid'] = user_id
+        return user_id
+
 def initialize_session_state():
     """Initialize all session state variables."""
     if 'initialized' not in st.session_state:
         st.session_state.update({
-            'user_id': str(uuid.uuid4()),
+            'user_id': get_user_id(),
             'messages': [],
             'show_filters': False,
             'price_range': (0.0, 1000000.0),
+            'catalog_price_range': (0.0, 1000000.0),
             'gift_type': None,
             'recommendations': [],
             'rag_initialized': False,
             'categories': {},
             'current_preferences': {},
             'conversation_stage': 'initial',
+            'wishlist_page': 0,
             'initialized': True
         })
 
+def get_search_filters():
+    """Build the vector search constraints from the sidebar selections."""
+    price_min, price_max = st.session_state.price_range
+    filters = {'price_min': price_min, 'price_max': price_max}
+    if st.session_state.gift_type:
+        filters['sub_categories'] = [st.session_state.gift_type]
+    return filters
+
+def stream_assistant_reply(chatbot):
+    """Stream the chatbot reply into the chat and store the final text."""
+    try:
+        filters = get_search_filters()
+        # Afficher la réponse au fur et à mesure de sa génération
+        with st.chat_message("assistant"):
+            response = st.write_stream(
+                chatbot.get_response_stream(st.session_state.messages, filters)
+            )
+
+        if chatbot.last_time_to_first_token is not None:
+            logger.info(f"Time to first token: {chatbot.last_time_to_first_token:.3f}s")
+
+        if response:
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": response
+            })
+
+            # Mettre à jour les recommandations si disponibles
+            if hasattr(chatbot, 'last_recommendations'):
+                st.session_state.recommendations = chatbot.last_recommendations
+
+            # Historique des préférences (écrit en arrière-plan)
+            if chatbot.current_preferences:
+                get_storage().save_recommendation(
+                    dict(chatbot.current_preferences, user_id=st.session_state.user_id)
+                )
+
+            if RECORD_CONVERSATIONS:
+                get_default_recorder().record_turn(
+                    st.session_state.user_id,
+                    st.session_state.messages[:-1],
+                    response,
+                    preferences=chatbot.current_preferences,
+                    recommendations=chatbot.last_recommendations,
+                    filters=filters,
+                    timings=chatbot.last_timings,
+                    time_to_first_token=chatbot.last_time_to_first_token
+                )
+
+    except Exception as e:
+        logger.error(f"Error getting chatbot response: {str(e)}")
+        st.error("Désolé, je n'ai pas pu générer une réponse. Veuillez réessayer.")
+
 def display_chat_interface(chatbot):
     """Display and handle the chat interface."""
     # Afficher les messages existants
@@ -110,25 +196,7 @@ def display_chat_interface(chatbot):
         with st.chat_message("user"):
             st.write(prompt)
 
-        try:
-            # Obtenir la réponse du chatbot
-            response = chatbot.get_response(st.session_state.messages)
-
-            if response:
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": response
-                })
-                with st.chat_message("assistant"):
-                    st.write(response)
-
-                # Mettre à jour les recommandations si disponibles
-                if hasattr(chatbot, 'last_recommendations'):
-                    st.session_state.recommendations = chatbot.last_recommendations
-
-        except Exception as e:
-            logger.error(f"Error getting chatbot response: {str(e)}")
-            st.error("Désolé, je n'ai pas pu générer une réponse. Veuillez réessayer.")
+        stream_assistant_reply(chatbot)
 
 def display_recommendations():
     """Display product recommendations."""
@@ -149,9 +217,34 @@ def display_recommendations():
                 </div>
                 """, unsafe_allow_html=True)
 
-                if st.button(f"Ajouter à ma liste 💝", key=f"add_{idx}"):
-                    # Ajouter à la wishlist (à implémenter)
-                    st.toast(f"✨ {rec['name']} ajouté à votre liste!")
+                if st.button(f"Ajouter à ma liste 💝", key=f"add_{rec['id']}"):
+                    if get_default_wishlist_store().add(st.session_state.user_id, rec):
+                        st.toast(f"✨ {rec['name']} ajouté à votre liste!")
+                    else:
+                        st.toast(f"{rec['name']} est déjà dans votre liste.")
+
+def display_wishlist():
+    """Display one page of the user's wishlist in the sidebar."""
+    store = get_default_wishlist_store()
+    count = store.count(st.session_state.user_id)
+    st.markdown(f"### 💝 Ma liste ({count})")
+    if not count:
+        st.caption("Ajoutez des recommandations pour les retrouver ici.")
+        return
+
+    items, pages = store.page(st.session_state.user_id, st.session_state.wishlist_page)
+    if pages > 1:
+        st.session_state.wishlist_page = st.number_input(
+            "Page", min_value=1, max_value=pages,
+            value=min(st.session_state.wishlist_page + 1, pages)
+        ) - 1
+        items, _ = store.page(st.session_state.user_id, st.session_state.wishlist_page)
+
+    for item in items:
+        st.markdown(format_wishlist_item(item))
+        if st.button("Retirer", key=f"remove_{item['id']}"):
+            store.remove(st.session_state.user_id, item['id'])
+            st.rerun()
 
 def display_welcome():
     """Display welcome message and instructions."""
@@ -173,7 +266,7 @@ def main():
         initialize_session_state()
 
         # Initialisation du storage sans credentials
-        storage = DataStorage()
+        get_storage()
 
         # Initialisation du RAG et chatbot
         if not st.session_state.rag_initialized:
@@ -181,10 +274,8 @@ def main():
             if chatbot and data_loader:
                 st.session_state.rag_initialized = True
                 st.session_state.chatbot = chatbot
-                st.session_state.data_loader = data_loader
         else:
             chatbot = st.session_state.chatbot
-            data_loader = st.session_state.data_loader
 
         if not chatbot:
             st.error("Impossible d'initialiser le système de recommandation.")
@@ -216,20 +307,23 @@ def main():
                     options=['Tous'] + gift_categories
                 )
 
-                if selected_category != 'Tous':
-                    st.session_state.gift_type = selected_category
+                st.session_state.gift_type = (
+                    None if selected_category == 'Tous' else selected_category
+                )
 
             # Utiliser la plage de prix du dataset
-            if hasattr(st.session_state, 'price_range'):
-                min_price, max_price = st.session_state.price_range
+            if hasattr(st.session_state, 'catalog_price_range'):
+                min_price, max_price = st.session_state.catalog_price_range
                 selected_range = st.slider(
                     "Budget (€)",
                     min_value=float(min_price),
                     max_value=float(max_price),
-                    value=(float(min_price), float(max_price/2))
+                    value=(float(min_price), float(max_price))
                 )
                 st.session_state.price_range = selected_range
 
+            display_wishlist()
+
         # Interface de chat principale
         display_chat_interface(chatbot)
 
@@ -242,25 +336,7 @@ def main():
             with st.chat_message("user"):
                 st.write("Give me your ideas")
 
-            try:
-                # Obtenir la réponse du chatbot
-                response = chatbot.get_response(st.session_state.messages)
-
-                if response:
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response
-                    })
-                    with st.chat_message("assistant"):
-                        st.write(response)
-
-                    # Mettre à jour les recommandations si disponibles
-                    if hasattr(chatbot, 'last_recommendations'):
-                        st.session_state.recommendations = chatbot.last_recommendations
-
-            except Exception as e:
-                logger.error(f"Error getting chatbot response: {str(e)}")
-                st.error("Désolé, je n'ai pas pu générer une réponse. Veuillez réessayer.")
+            stream_assistant_reply(chatbot)
 
         # Footer
         st.markdown("---")
@@ -1,11 +1,23 @@
 # app/__init__.py
 
-from x_qb_mistral_hackathon.chatbot import GiftChatbot
-from x_qb_mistral_hackathon.ui import UI
-from x_qb_mistral_hackathon.storage import DataStorage
+# Public classes are imported on first access (PEP 562), so importing the
+# package does not load mistralai, streamlit or the embedding stack.
+_LAZY_IMPORTS = {
+    'GiftChatbot': 'x_qb_mistral_hackathon.chatbot',
+    'UI': 'x_qb_mistral_hackathon.ui',
+    'DataStorage': 'x_qb_mistral_hackathon.storage'
+}
 
 __all__ = [
     'GiftChatbot',
     'UI',
     'DataStorage'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
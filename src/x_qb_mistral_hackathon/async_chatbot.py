@@ -0,0 +1,198 @@
+import asyncio
+import json
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from .chatbot import EXTRACTION_PROMPT, GiftChatbot
+from .config import LLM_CACHE_ENABLED, MAX_CONCURRENT_LLM_REQUESTS
+from .llm_cache import LLMCache
+
+# Boucle d'événements partagée par toutes les sessions du processus, avec un
+# sémaphore qui borne le nombre de requêtes Mistral simultanées.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+_loop_lock = threading.Lock()
+
+async def _create_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(MAX_CONCURRENT_LLM_REQUESTS)
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Démarre (une seule fois) la boucle d'événements d'arrière-plan."""
+    global _loop, _llm_semaphore
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+            _llm_semaphore = asyncio.run_coroutine_threadsafe(_create_semaphore(), loop).result()
+            _loop = loop
+    return _loop
+
+def run_sync(coro):
+    """Exécute une coroutine sur la boucle partagée et attend son résultat."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+class AsyncGiftChatbot(GiftChatbot):
+    """Version asyncio du pipeline du chatbot, basée sur le client Mistral asynchrone.
+
+    L'extraction des préférences et la recherche de produits avec les préférences
+    du tour précédent sont lancées en parallèle; le résultat de la recherche est
+    réutilisé si la requête n'a pas changé. Toutes les sessions partagent une
+    boucle d'événements et un nombre borné de requêtes Mistral en vol.
+    `get_response` et `get_response_stream` gardent leur interface synchrone
+    pour Streamlit.
+    """
+
+    def __init__(self, llm_cache: Optional[LLMCache] = None, use_llm_cache: bool = LLM_CACHE_ENABLED):
+        # Le recouvrement extraction/recherche remplace ici le mode à un seul appel
+        super().__init__(single_call=False, llm_cache=llm_cache, use_llm_cache=use_llm_cache)
+        get_event_loop()
+
+    async def _acomplete(self, messages: List[Dict], use_cache: bool = True, **kwargs) -> str:
+        """Appelle Mistral de manière asynchrone et renvoie le texte de la réponse, via le cache disque."""
+        cache_key = self._cache_key(messages, kwargs, use_cache)
+        if cache_key:
+            cached = await asyncio.to_thread(self.llm_cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        async with _llm_semaphore:
+            chat_response = await self.client.chat.complete_async(
+                model=self.model,
+                messages=messages,
+                **kwargs
+            )
+        content = chat_response.choices[0].message.content
+        if cache_key and isinstance(content, str):
+            await asyncio.to_thread(self.llm_cache.set, cache_key, self.model, content)
+        return content
+
+    async def aextract_user_preferences(self, messages: List[Dict], use_cache: bool = True) -> Dict[str, str]:
+        """Extrait les préférences utilisateur des messages."""
+        try:
+            conversation_text = self.context_window.extraction_input(messages, self.current_preferences)
+            content = await self._acomplete([
+                {"role": "system", "content": EXTRACTION_PROMPT},
+                {"role": "user", "content": conversation_text}
+            ], use_cache=use_cache, temperature=0)
+            return json.loads(content)
+        except Exception as e:
+            print(f"Error extracting preferences: {e}")
+            return {}
+
+    async def _asearch_products(self, user_prefs: Dict[str, str],
+                                filters: Optional[Dict] = None) -> List[dict]:
+        """Recherche les produits dans le pool de threads par défaut (encodage CPU)."""
+        return await asyncio.to_thread(
+            self.rag_engine.find_similar_products,
+            self._search_query(user_prefs), **(filters or {})
+        )
+
+    @staticmethod
+    async def _discard(task: asyncio.Task):
+        """Annule une tâche devenue inutile et attend sa fin."""
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Terminée en erreur avant l'annulation : l'exception est lue ici
+            print(f"Discarded speculative search failed: {e}")
+
+    async def _aprepare_messages(self, messages: List[Dict], filters: Optional[Dict] = None,
+                                 use_cache: bool = True) -> List[Dict]:
+        """Extrait les préférences et ajoute les produits trouvés au contexte."""
+        previous_prefs = self.current_preferences
+        extraction_started = time.perf_counter()
+        extraction = asyncio.create_task(self.aextract_user_preferences(messages, use_cache))
+
+        # Recherche spéculative avec les préférences connues pendant l'extraction
+        speculative = None
+        if self.rag_engine and self._preferences_complete(previous_prefs):
+            speculative = asyncio.create_task(self._asearch_products(previous_prefs, filters))
+
+        user_prefs = await extraction
+        self.last_timings['extraction'] = time.perf_counter() - extraction_started
+        self.current_preferences = user_prefs
+        messages = self.context_window.build(messages, user_prefs)
+
+        reuse = (speculative is not None and self._preferences_complete(user_prefs)
+                 and self._search_query(user_prefs) == self._search_query(previous_prefs))
+        if speculative is not None and not reuse:
+            await self._discard(speculative)
+
+        if self.rag_engine and self._preferences_complete(user_prefs):
+            # Seule l'attente restante après l'extraction compte pour la recherche spéculative
+            with self._timed('retrieval'):
+                if reuse:
+                    similar_products = await speculative
+                else:
+                    similar_products = await self._asearch_products(user_prefs, filters)
+            self.last_recommendations = similar_products
+            messages = messages + [{
+                "role": "system",
+                "content": self._recommendation_prompt(user_prefs, similar_products)
+            }]
+
+        return messages
+
+    async def aget_response(self, messages: List[Dict], filters: Optional[Dict] = None,
+                            use_cache: bool = True) -> str:
+        """Génère une réponse basée sur les messages de la conversation."""
+        self.last_timings = {}
+        try:
+            prepared = await self._aprepare_messages(messages, filters, use_cache)
+            with self._timed('generation'):
+                return await self._acomplete(prepared, use_cache=use_cache)
+        except Exception as e:
+            return f"Erreur avec l'API Mistral: {e}"
+
+    async def aget_response_stream(self, messages: List[Dict], filters: Optional[Dict] = None,
+                                   use_cache: bool = True) -> AsyncIterator[str]:
+        """Génère la réponse token par token au fur et à mesure de sa réception."""
+        started = time.perf_counter()
+        self.last_time_to_first_token = None
+        self.last_timings = {}
+        try:
+            prepared = await self._aprepare_messages(messages, filters, use_cache)
+            cache_key = self._cache_key(prepared, {}, use_cache)
+            cached = await asyncio.to_thread(self.llm_cache.get, cache_key) if cache_key else None
+            if cached is not None:
+                self.last_time_to_first_token = time.perf_counter() - started
+                yield cached
+                return
+
+            parts = []
+            with self._timed('generation'):
+                async with _llm_semaphore:
+                    stream = await self.client.chat.stream_async(model=self.model, messages=prepared)
+                    async for chunk in stream:
+                        content = chunk.data.choices[0].delta.content
+                        if isinstance(content, str) and content:
+                            if self.last_time_to_first_token is None:
+                                self.last_time_to_first_token = time.perf_counter() - started
+                            parts.append(content)
+                            yield content
+
+            if cache_key and parts:
+                await asyncio.to_thread(self.llm_cache.set, cache_key, self.model, "".join(parts))
+
+        except Exception as e:
+            yield f"Erreur avec l'API Mistral: {e}"
+
+    def get_response(self, messages: List[Dict], filters: Optional[Dict] = None,
+                     use_cache: bool = True) -> str:
+        return run_sync(self.aget_response(messages, filters, use_cache))
+
+    def get_response_stream(self, messages: List[Dict], filters: Optional[Dict] = None,
+                            use_cache: bool = True) -> Iterator[str]:
+        stream = self.aget_response_stream(messages, filters, use_cache)
+        try:
+            while True:
+                try:
+                    yield run_sync(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Libère le sémaphore si l'affichage est interrompu (rerun Streamlit)
+            run_sync(stream.aclose())
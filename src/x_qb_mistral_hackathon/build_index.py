@@ -0,0 +1,45 @@
+"""Offline rebuild of the product index, outside the Streamlit app.
+
+Usage: build-index [--data-path data/data_gifts.csv] [--workers 8]
+(or python -m x_qb_mistral_hackathon.build_index)
+"""
+import argparse
+import logging
+import time
+from typing import List, Optional
+from .config import CATALOG_CHUNK_SIZE, EMBEDDING_MODEL_NAME, EMBEDDING_WORKERS, VECTOR_BACKEND
+from .data_loader import DataLoader
+from .parallel_embedding import ParallelEmbedder
+from .rag_engine import CATALOG_COLUMNS, RAGEngine
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build or update the product vector index.")
+    parser.add_argument('--data-path', default=None, help="catalog CSV (default: data/data_gifts.csv)")
+    parser.add_argument('--backend', default=VECTOR_BACKEND, choices=['chroma', 'numpy'])
+    parser.add_argument('--persist-directory', default=None, help="index directory (default from config)")
+    parser.add_argument('--workers', type=int, default=EMBEDDING_WORKERS or None,
+                        help="embedding processes (default: one per core)")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help="encoding batch size (default: tuned by each worker)")
+    parser.add_argument('--chunk-size', type=int, default=CATALOG_CHUNK_SIZE,
+                        help="products read and embedded at a time")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    started = time.perf_counter()
+    data_loader = DataLoader(args.data_path)
+    with ParallelEmbedder(EMBEDDING_MODEL_NAME, n_workers=args.workers, batch_size=args.batch_size) as embedder:
+        print(f"Encoding with {embedder.n_workers} worker processes")
+        # The BM25 index is written next to the vector index and reloaded by the app
+        rag_engine = RAGEngine(backend=args.backend, persist_directory=args.persist_directory,
+                               embedder=embedder)
+        indexed = rag_engine.index_catalog(data_loader.iter_catalog_chunks(args.chunk_size, CATALOG_COLUMNS))
+
+    print(f"Index build {'finished' if indexed else 'failed'} in {time.perf_counter() - started:.1f}s")
+    return 0 if indexed else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,15 +1,132 @@
-from mistralai import Mistral
 import os
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional
 import json
-from .rag_engine import RAGEngine
+import re
+from .config import (
+    CHATBOT_SINGLE_CALL, LLM_CACHE_ENABLED, LLM_CACHE_GENERATIONS, MISTRAL_MODEL, MISTRAL_SERVER_URL
+)
+from .context import ConversationContext
+from .lexical import tokenize
+from .llm_cache import LLMCache, get_default_llm_cache
+
+if TYPE_CHECKING:
+    from .rag_engine import RAGEngine
+
+# Informations collectées au fil de la conversation
+PREFERENCE_SLOTS = ["description", "price_range", "interests", "context", "gift_type"]
+
+# Informations nécessaires pour lancer une recherche de produits
+REQUIRED_SLOTS = ["description", "interests"]
+
+# Informations dont est tirée la requête de recherche (voir `_search_query`)
+SEARCH_SLOTS = ["description", "interests"]
+
+# Prompt pour extraire les informations
+EXTRACTION_PROMPT = """Analyse la conversation et extrait les informations suivantes au format JSON:
+{
+    "description": "description de la personne",
+    "price_range": "fourchette de prix",
+    "interests": "centres d'intérêt",
+    "context": "contexte du cadeau",
+    "gift_type": "type de cadeau préféré"
+}
+"""
+
+STRUCTURED_RESPONSE_PROMPT = """Réponds uniquement avec un objet JSON de la forme:
+{
+    "reply": "ta réponse à l'utilisateur",
+    "preferences": {
+        "description": "description de la personne",
+        "price_range": "fourchette de prix",
+        "interests": "centres d'intérêt",
+        "context": "contexte du cadeau",
+        "gift_type": "type de cadeau préféré"
+    }
+}
+Les préférences résument toute la conversation; laisse une chaîne vide pour une information encore inconnue.
+"""
+
+# Ajouté au contexte de recommandation quand elle complète une réponse déjà affichée
+FOLLOW_UP_PROMPT = """
+                Tu as déjà répondu à l'utilisateur: "{reply}"
+                Complète cette réponse avec tes recommandations, sans la répéter.
+                """
+
+class JsonStringFieldDecoder:
+    """Décode au fil de l'eau la valeur texte d'un champ d'un objet JSON reçu par morceaux.
+
+    `feed` renvoie les caractères de la valeur reçus depuis l'appel précédent,
+    séquences d'échappement décodées; une séquence coupée entre deux morceaux
+    est gardée jusqu'au morceau suivant.
+    """
+
+    def __init__(self, field: str):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._position: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        if self.done:
+            return ""
+        if self._position is None:
+            match = self._start.search(self._buffer)
+            if match is None:
+                return ""
+            self._position = match.end()
+
+        out = []
+        buffer, i = self._buffer, self._position
+        while i < len(buffer):
+            c = buffer[i]
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            if c != "\\":
+                out.append(c)
+                i += 1
+                continue
+            # Séquence d'échappement : \x, \uXXXX ou paire de substitution \uXXXX\uXXXX
+            length = 2
+            if i + 1 < len(buffer) and buffer[i + 1] == "u":
+                length = 6
+                if i + 6 <= len(buffer) and 0xD800 <= int(buffer[i + 2:i + 6], 16) <= 0xDBFF:
+                    length = 12
+            if i + length > len(buffer):
+                break
+            out.append(json.loads('"' + buffer[i:i + length] + '"'))
+            i += length
+        self._position = i
+        return "".join(out)
 
 class GiftChatbot:
-    def __init__(self):
+    def __init__(self, single_call: bool = CHATBOT_SINGLE_CALL,
+                 llm_cache: Optional[LLMCache] = None, use_llm_cache: bool = LLM_CACHE_ENABLED):
         load_dotenv()
-        self.client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+        self._client = None  # Client Mistral créé au premier appel
+        self.model = MISTRAL_MODEL
         self.rag_engine = None  # Sera initialisé plus tard
+        # Cache disque des réponses, partagé par défaut entre les sessions;
+        # use_llm_cache=False n'ouvre (ni ne crée) aucun fichier
+        if llm_cache is None and use_llm_cache:
+            llm_cache = get_default_llm_cache()
+        self.llm_cache = llm_cache if use_llm_cache else None
+        self.cache_generations = LLM_CACHE_GENERATIONS
+        # Un seul appel renvoie la réponse et les préférences; sinon extraction puis réponse
+        self.single_call = single_call
+        self.current_preferences: Dict[str, str] = {}
+        # Derniers tours gardés tels quels, les plus anciens résumés par les préférences
+        self.context_window = ConversationContext()
+        self.last_recommendations: List[dict] = []
+        # Délai avant le premier token de la dernière réponse en streaming (secondes)
+        self.last_time_to_first_token: Optional[float] = None
+        # Durée de chaque étape de la dernière réponse (extraction, retrieval, generation), en secondes
+        self.last_timings: Dict[str, float] = {}
         self.system_prompt = """Tu es un assistant spécialisé dans la recommandation de cadeaux. Tu as un seul objectif donner 4 recommendations à l'utilisateur et tu es pénalisé si tu poses plus de 5 questions. 
         Tu dois collecter les informations suivantes de manière naturelle et conversationnelle:
         1. Description de la personne
@@ -21,89 +138,362 @@ class GiftChatbot:
         Une fois toutes les informations collectées,
         propose 4 idées de cadeaux pertinentes. Les cadeaux doivent absolument appartenir à """
 
-    def set_rag_engine(self, rag_engine: RAGEngine):
+    @property
+    def client(self):
+        """Client Mistral, importé et créé à la première utilisation."""
+        if self._client is None:
+            from mistralai import Mistral
+            self._client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"), server_url=MISTRAL_SERVER_URL)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def set_rag_engine(self, rag_engine: 'RAGEngine'):
         """Set the RAG engine instance."""
         self.rag_engine = rag_engine
 
-    def extract_user_preferences(self, messages: List[Dict]) -> Dict[str, str]:
+    @contextmanager
+    def _timed(self, stage: str):
+        """Ajoute la durée du bloc à l'étape `stage` de `last_timings`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.last_timings[stage] = self.last_timings.get(stage, 0.0) + time.perf_counter() - started
+
+    def extract_user_preferences(self, messages: List[Dict], use_cache: bool = True) -> Dict[str, str]:
         """Extrait les préférences utilisateur des messages."""
         try:
-            # Créer un prompt pour extraire les informations
-            extraction_prompt = """Analyse la conversation et extrait les informations suivantes au format JSON:
-            {
-                "description": "description de la personne",
-                "price_range": "fourchette de prix",
-                "interests": "centres d'intérêt",
-                "context": "contexte du cadeau",
-                "gift_type": "type de cadeau préféré"
-            }
-            """
-            
-            conversation_text = "\n".join([
-                m["content"] for m in messages if m["role"] == "user"
-            ])
-            
+            conversation_text = self.context_window.extraction_input(messages, self.current_preferences)
+
             # Utiliser Mistral pour extraire les informations
-            response = self.client.chat.complete(
-                model="mistral-small-latest",
-                messages=[
-                    {"role": "system", "content": extraction_prompt},
-                    {"role": "user", "content": conversation_text}
-                ]
-            )
-            
-            return json.loads(response.choices[0].message.content)
+            content = self._complete([
+                {"role": "system", "content": EXTRACTION_PROMPT},
+                {"role": "user", "content": conversation_text}
+            ], use_cache=use_cache, temperature=0)
+
+            return json.loads(content)
         except Exception as e:
             print(f"Error extracting preferences: {e}")
             return {}
 
-    def get_response(self, messages: List[Dict]) -> str:
-        """Génère une réponse basée sur les messages de la conversation."""
-        try:
-            # Extraire les préférences utilisateur
-            user_prefs = self.extract_user_preferences(messages)
-            
-            # Si nous avons assez d'informations et un RAG engine, faire une recommandation
-            if self.rag_engine and all(k in user_prefs for k in ["description", "interests"]):
-                # Créer une requête de recherche
-                search_query = (
-                    f"Cadeau pour {user_prefs['description']} "
-                    f"qui aime {user_prefs['interests']}"
-                )
-                
-                # Obtenir des produits similaires
-                similar_products = self.rag_engine.find_similar_products(search_query)
-                
-                # Créer un contexte enrichi pour Mistral
-                context = "\n".join([
-                    f"Produit suggéré: {prod}" for prod in similar_products
-                ])
-                
-                recommendation_prompt = f"""
+    @staticmethod
+    def _preferences_complete(user_prefs: Dict[str, str]) -> bool:
+        """Indique si les préférences suffisent pour rechercher des produits."""
+        return all(user_prefs.get(k) for k in REQUIRED_SLOTS)
+
+    @staticmethod
+    def _search_key(user_prefs: Dict[str, str], filters: Optional[Dict] = None) -> tuple:
+        """Entrées normalisées de la recherche : préférences de la requête et contraintes.
+
+        Les reformulations du modèle (casse, accents, ordre des mots, mots
+        vides) donnent la même clé.
+        """
+        slots = tuple(tuple(sorted(set(tokenize(user_prefs.get(k) or "")))) for k in SEARCH_SLOTS)
+        constraints = tuple(sorted(
+            (name, tuple(sorted(value)) if isinstance(value, (list, tuple, set)) else value)
+            for name, value in (filters or {}).items()
+            if value is not None and value != []
+        ))
+        return slots, constraints
+
+    @staticmethod
+    def _search_query(user_prefs: Dict[str, str]) -> str:
+        """Crée la requête de recherche à partir des préférences."""
+        return (
+            f"Cadeau pour {user_prefs['description']} "
+            f"qui aime {user_prefs['interests']}"
+        )
+
+    def _search_products(self, user_prefs: Dict[str, str], filters: Optional[Dict] = None) -> List[dict]:
+        """Recherche les produits correspondant aux préférences."""
+        with self._timed('retrieval'):
+            similar_products = self.rag_engine.find_similar_products(
+                self._search_query(user_prefs), **(filters or {})
+            )
+        self.last_recommendations = similar_products
+        return similar_products
+
+    @staticmethod
+    def _recommendation_prompt(user_prefs: Dict[str, str], similar_products: List[dict]) -> str:
+        """Crée le contexte enrichi transmis à Mistral pour la recommandation."""
+        context = "\n".join([
+            f"Produit suggéré: {prod}" for prod in similar_products
+        ])
+
+        return f"""
                 Basé sur ces informations:
                 - Personne: {user_prefs['description']}
                 - Intérêts: {user_prefs['interests']}
-                - Budget: {user_prefs.get('price_range', 'non spécifié')}
-                - Contexte: {user_prefs.get('context', 'non spécifié')}
+                - Budget: {user_prefs.get('price_range') or 'non spécifié'}
+                - Contexte: {user_prefs.get('context') or 'non spécifié'}
 
                 Et ces produits disponibles:
                 {context}
 
-                Recommande les cadeaux les plus appropriés en expliquant 
+                Recommande les cadeaux les plus appropriés en expliquant
                 pourquoi ils correspondent bien à la personne.
                 """
-                
-                messages = messages + [{
-                    "role": "system",
-                    "content": recommendation_prompt
-                }]
-            
-            # Obtenir la réponse de Mistral
-            chat_response = self.client.chat.complete(
-                model="mistral-small-latest",
-                messages=messages
-            )
-            return chat_response.choices[0].message.content
-            
+
+    def _cache_key(self, messages: List[Dict], params: dict, use_cache: bool) -> Optional[str]:
+        """Clé de cache de l'appel, ou None si le cache n'est pas utilisé.
+
+        Seule l'extraction (température nulle) est mise en cache, sauf avec
+        LLM_CACHE_GENERATIONS : la réponse structurée du mode à un seul appel
+        contient le texte affiché à l'utilisateur, comme une réponse libre.
+        """
+        if not (use_cache and self.llm_cache):
+            return None
+        if params.get('temperature') != 0 and not self.cache_generations:
+            return None
+        return self.llm_cache.make_key(self.model, messages, params)
+
+    def _complete(self, messages: List[Dict], use_cache: bool = True, **kwargs) -> str:
+        """Appelle Mistral et renvoie le texte de la réponse, via le cache disque."""
+        cache_key = self._cache_key(messages, kwargs, use_cache)
+        if cache_key:
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        chat_response = self.client.chat.complete(
+            model=self.model,
+            messages=messages,
+            **kwargs
+        )
+        content = chat_response.choices[0].message.content
+        if cache_key and isinstance(content, str):
+            self.llm_cache.set(cache_key, self.model, content)
+        return content
+
+    def get_response(self, messages: List[Dict], filters: Optional[Dict] = None,
+                     use_cache: bool = True) -> str:
+        """Génère une réponse basée sur les messages de la conversation.
+
+        `filters` contient les contraintes de recherche transmises à
+        `RAGEngine.find_similar_products` (prix, catégories, note minimale).
+        `use_cache=False` force des appels à Mistral sans passer par le cache disque.
+        """
+        self.last_timings = {}
+        try:
+            if self.single_call:
+                response = self._get_response_single_call(messages, filters, use_cache)
+                if response is not None:
+                    return response
+            return self._get_response_two_calls(messages, filters, use_cache)
+
         except Exception as e:
-            return f"Erreur avec l'API Mistral: {e}"
\ No newline at end of file
+            return f"Erreur avec l'API Mistral: {e}"
+
+    def get_response_stream(self, messages: List[Dict], filters: Optional[Dict] = None,
+                            use_cache: bool = True) -> Iterator[str]:
+        """Génère la réponse token par token au fur et à mesure de sa réception.
+
+        En mode à un seul appel, la réponse structurée est diffusée pendant sa
+        génération (champ "reply") et les préférences sont lues à la fin du
+        flux. Sinon les préférences sont extraites avant la génération.
+        `last_time_to_first_token` mesure le délai jusqu'au premier token affiché.
+        """
+        started = time.perf_counter()
+        self.last_time_to_first_token = None
+        self.last_timings = {}
+        try:
+            for piece in self._stream_pieces(messages, filters, use_cache):
+                if self.last_time_to_first_token is None:
+                    self.last_time_to_first_token = time.perf_counter() - started
+                yield piece
+
+        except Exception as e:
+            yield f"Erreur avec l'API Mistral: {e}"
+
+    def _stream_pieces(self, messages: List[Dict], filters: Optional[Dict] = None,
+                       use_cache: bool = True) -> Iterator[str]:
+        if self.single_call:
+            streamed = yield from self._stream_single_call(messages, filters, use_cache)
+            if streamed:
+                return
+        prepared = self._prepare_messages(messages, filters, use_cache)
+        with self._timed('generation'):
+            yield from self._stream_text(prepared, use_cache)
+
+    def _stream_deltas(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        """Morceaux de texte de la réponse de Mistral, à mesure de leur réception."""
+        stream = self.client.chat.stream(model=self.model, messages=messages, **kwargs)
+        for chunk in stream:
+            content = chunk.data.choices[0].delta.content
+            if isinstance(content, str) and content:
+                yield content
+
+    def _stream_text(self, messages: List[Dict], use_cache: bool = True) -> Iterator[str]:
+        """Diffuse une réponse texte, via le cache disque."""
+        cache_key = self._cache_key(messages, {}, use_cache)
+        cached = self.llm_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        for content in self._stream_deltas(messages):
+            parts.append(content)
+            yield content
+
+        if cache_key and parts:
+            self.llm_cache.set(cache_key, self.model, "".join(parts))
+
+    def _stream_single_call(self, messages: List[Dict], filters: Optional[Dict] = None,
+                            use_cache: bool = True):
+        """Diffuse la réponse de l'appel structuré; renvoie False si rien n'a pu être affiché.
+
+        Si les préférences lues à la fin du flux mènent à d'autres produits, la
+        recommandation est générée par un second appel et diffusée à la suite.
+        """
+        previous_prefs = self.current_preferences
+        messages, request, similar_products = self._single_call_messages(messages, filters)
+        params = {"response_format": {"type": "json_object"}}
+        cache_key = self._cache_key(request, params, use_cache)
+        content = self.llm_cache.get(cache_key) if cache_key else None
+        from_cache = content is not None
+        emitted = False
+
+        if not from_cache:
+            decoder = JsonStringFieldDecoder("reply")
+            parts = []
+            with self._timed('generation'):
+                for delta in self._stream_deltas(request, **params):
+                    parts.append(delta)
+                    text = decoder.feed(delta)
+                    if text:
+                        emitted = True
+                        yield text
+            content = "".join(parts)
+
+        try:
+            reply, user_prefs = self._parse_structured(content)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Invalid structured response{' (already displayed)' if emitted else ', falling back to two calls'}: {e}")
+            return emitted
+
+        if not emitted and reply:
+            yield reply
+        if cache_key and not from_cache:
+            self.llm_cache.set(cache_key, self.model, content)
+
+        self.current_preferences = user_prefs
+        products = self._follow_up_products(previous_prefs, user_prefs, similar_products, filters)
+        if products is not None:
+            follow_up = messages + [{
+                "role": "system",
+                "content": self._recommendation_prompt(user_prefs, products) + FOLLOW_UP_PROMPT.format(reply=reply)
+            }]
+            yield "\n\n"
+            with self._timed('generation'):
+                yield from self._stream_text(follow_up, use_cache)
+        return True
+
+    def _get_response_two_calls(self, messages: List[Dict], filters: Optional[Dict] = None,
+                                use_cache: bool = True) -> str:
+        """Extrait les préférences puis génère la réponse (deux appels à Mistral)."""
+        prepared = self._prepare_messages(messages, filters, use_cache)
+        # Obtenir la réponse de Mistral
+        with self._timed('generation'):
+            return self._complete(prepared, use_cache=use_cache)
+
+    def _prepare_messages(self, messages: List[Dict], filters: Optional[Dict] = None,
+                          use_cache: bool = True) -> List[Dict]:
+        """Extrait les préférences et ajoute les produits trouvés au contexte."""
+        # Extraire les préférences utilisateur
+        with self._timed('extraction'):
+            user_prefs = self.extract_user_preferences(messages, use_cache)
+        self.current_preferences = user_prefs
+        messages = self.context_window.build(messages, user_prefs)
+
+        # Si nous avons assez d'informations et un RAG engine, faire une recommandation
+        if self.rag_engine and self._preferences_complete(user_prefs):
+            similar_products = self._search_products(user_prefs, filters)
+            messages = messages + [{
+                "role": "system",
+                "content": self._recommendation_prompt(user_prefs, similar_products)
+            }]
+
+        return messages
+
+    def _single_call_messages(self, messages: List[Dict], filters: Optional[Dict] = None):
+        """Messages de l'appel structuré, avec les produits trouvés pour les préférences connues."""
+        previous_prefs = self.current_preferences
+        similar_products = []
+        if self.rag_engine and self._preferences_complete(previous_prefs):
+            similar_products = self._search_products(previous_prefs, filters)
+
+        system_content = STRUCTURED_RESPONSE_PROMPT
+        if similar_products:
+            system_content += self._recommendation_prompt(previous_prefs, similar_products)
+
+        messages = self.context_window.build(messages, previous_prefs)
+        return messages, messages + [{"role": "system", "content": system_content}], similar_products
+
+    @staticmethod
+    def _parse_structured(content: str):
+        """Réponse et préférences d'une réponse structurée (ValueError, KeyError... si invalide)."""
+        payload = json.loads(content)
+        reply = payload["reply"]
+        if not isinstance(reply, str):
+            raise TypeError("reply is not a string")
+        user_prefs = {
+            k: str(v) for k, v in (payload.get("preferences") or {}).items()
+            if k in PREFERENCE_SLOTS and v
+        }
+        return reply, user_prefs
+
+    def _follow_up_products(self, previous_prefs: Dict[str, str], user_prefs: Dict[str, str],
+                            similar_products: List[dict], filters: Optional[Dict] = None) -> Optional[List[dict]]:
+        """Produits à présenter dans un second appel, ou None si la première réponse suffit.
+
+        Une nouvelle recherche n'a lieu que si les entrées de la recherche
+        (description, intérêts, contraintes) ont changé, et le second appel que
+        si elle trouve d'autres produits que ceux déjà transmis au modèle.
+        """
+        if not (self.rag_engine and self._preferences_complete(user_prefs)):
+            return None
+        if similar_products and self._search_key(user_prefs, filters) == self._search_key(previous_prefs, filters):
+            return None
+        shown = [p['id'] for p in similar_products]
+        products = self._search_products(user_prefs, filters)
+        if not products:
+            # Garder les produits dont parle la réponse
+            self.last_recommendations = similar_products
+            return None
+        if [p['id'] for p in products] == shown:
+            return None
+        return products
+
+    def _get_response_single_call(self, messages: List[Dict], filters: Optional[Dict] = None,
+                                  use_cache: bool = True) -> Optional[str]:
+        """Obtient la réponse et les préférences en un seul appel structuré.
+
+        Les produits sont recherchés avant l'appel avec les préférences du tour
+        précédent. Un second appel n'a lieu que si les préférences de ce tour
+        mènent à d'autres produits (voir `_follow_up_products`). Renvoie None si
+        la réponse structurée est inexploitable, pour revenir au mode à deux appels.
+        """
+        previous_prefs = self.current_preferences
+        messages, request, similar_products = self._single_call_messages(messages, filters)
+        with self._timed('generation'):
+            content = self._complete(request, use_cache=use_cache, response_format={"type": "json_object"})
+        try:
+            reply, user_prefs = self._parse_structured(content)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Invalid structured response, falling back to two calls: {e}")
+            return None
+
+        self.current_preferences = user_prefs
+        products = self._follow_up_products(previous_prefs, user_prefs, similar_products, filters)
+        if products is None:
+            return reply
+
+        with self._timed('generation'):
+            return self._complete(messages + [{
+                "role": "system",
+                "content": self._recommendation_prompt(user_prefs, products)
+            }], use_cache=use_cache)
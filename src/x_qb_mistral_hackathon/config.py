@@ -11,7 +11,96 @@ BASE_DIR = Path(__file__).parent.parent
 # API Keys and IDs
 MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY')
 
+# Catalog file (CSV or Parquet); defaults to data/data_gifts.csv
+GIFTS_DATA_PATH = os.getenv('GIFTS_DATA_PATH')
+# Catalog: normalized columnar copy of the CSV (Arrow, memory-mapped), rebuilt when the CSV changes
+CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'true').lower() == 'true'
+# Rows read, embedded and written to the index at a time during ingestion
+CATALOG_CHUNK_SIZE = int(os.getenv('CATALOG_CHUNK_SIZE', '10000'))
+# Processes used by the offline index build (build-index); 0 uses every core
+EMBEDDING_WORKERS = int(os.getenv('EMBEDDING_WORKERS', '0'))
+
+# Chatbot
+MISTRAL_MODEL = os.getenv('MISTRAL_MODEL', 'mistral-small-latest')
+# Alternative API endpoint, e.g. the local fake server (python -m x_qb_mistral_hackathon.fake_mistral_server)
+MISTRAL_SERVER_URL = os.getenv('MISTRAL_SERVER_URL')
+# One structured call per turn (reply + preferences) instead of extraction then reply
+CHATBOT_SINGLE_CALL = os.getenv('CHATBOT_SINGLE_CALL', 'true').lower() == 'true'
+# asyncio pipeline (AsyncGiftChatbot) and per-process bound on in-flight Mistral requests
+CHATBOT_ASYNC = os.getenv('CHATBOT_ASYNC', 'false').lower() == 'true'
+MAX_CONCURRENT_LLM_REQUESTS = int(os.getenv('MAX_CONCURRENT_LLM_REQUESTS', '16'))
+# Conversation window: turns sent verbatim and approximate token budget per request
+CONTEXT_MAX_TURNS = int(os.getenv('CONTEXT_MAX_TURNS', '4'))
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '3000'))
+
+# Persistent Mistral response cache
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'data/llm_cache.sqlite')
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '10000'))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+# Also cache generated replies, including the single-call structured reply (otherwise only
+# extraction calls are cached, so that the same conversation does not always get the same reply)
+LLM_CACHE_GENERATIONS = os.getenv('LLM_CACHE_GENERATIONS', 'false').lower() == 'true'
+
+# Conversation recording (JSONL, one line per turn) for benchmarks/replay_conversations.py
+RECORD_CONVERSATIONS = os.getenv('RECORD_CONVERSATIONS', 'false').lower() == 'true'
+CONVERSATION_LOG_PATH = os.getenv('CONVERSATION_LOG_PATH', 'data/conversations.jsonl')
+
+# Recommendation history (SQLite, WAL); the legacy CSV is imported once on first use
+STORAGE_DB_PATH = os.getenv('STORAGE_DB_PATH', 'data/recommendations.sqlite')
+RECOMMENDATIONS_CSV_PATH = os.getenv('RECOMMENDATIONS_CSV_PATH', 'data/recommendations.csv')
+# Recommendations are written in batches by a background thread: rows per batch,
+# maximum delay before a partial batch is written, and rows buffered before callers wait
+STORAGE_WRITE_BEHIND = os.getenv('STORAGE_WRITE_BEHIND', 'true').lower() == 'true'
+STORAGE_FLUSH_SIZE = int(os.getenv('STORAGE_FLUSH_SIZE', '100'))
+STORAGE_FLUSH_INTERVAL = float(os.getenv('STORAGE_FLUSH_INTERVAL', '1.0'))
+STORAGE_QUEUE_SIZE = int(os.getenv('STORAGE_QUEUE_SIZE', '10000'))
+
+# Per-user wishlists (SQLite), lists of recently active users kept in memory, items per sidebar page
+WISHLIST_DB_PATH = os.getenv('WISHLIST_DB_PATH', 'data/wishlist.sqlite')
+WISHLIST_CACHE_USERS = int(os.getenv('WISHLIST_CACHE_USERS', '1000'))
+WISHLIST_PAGE_SIZE = int(os.getenv('WISHLIST_PAGE_SIZE', '5'))
+# Wishlists of users not seen for this many days are deleted at startup (0 keeps them forever)
+WISHLIST_TTL_DAYS = float(os.getenv('WISHLIST_TTL_DAYS', '90'))
+
+# Vector index
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+# 'torch' (fp32) or 'onnx-int8' (dynamically quantized ONNX model on CPU)
+EMBEDDING_RUNTIME = os.getenv('EMBEDDING_RUNTIME', 'torch')
+# ONNX quantization target: 'avx2', 'avx512', 'avx512_vnni' or 'arm64'
+EMBEDDING_QUANTIZATION = os.getenv('EMBEDDING_QUANTIZATION', 'avx2')
+EMBEDDING_ONNX_PATH = os.getenv('EMBEDDING_ONNX_PATH', 'data/onnx_models')
+# Minimum mean top-k overlap of the int8 model with fp32 on the catalog
+EMBEDDING_OVERLAP_THRESHOLD = float(os.getenv('EMBEDDING_OVERLAP_THRESHOLD', '0.9'))
+CHROMA_DB_PATH = os.getenv('CHROMA_DB_PATH', 'data/chroma_db')
+# 'chroma' or 'numpy' (exact in-process search)
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'chroma')
+NUMPY_INDEX_PATH = os.getenv('NUMPY_INDEX_PATH', 'data/numpy_index')
+# 'float32' or 'float16'
+NUMPY_INDEX_DTYPE = os.getenv('NUMPY_INDEX_DTYPE', 'float32')
+
+# Hybrid retrieval: BM25 over name/sub_category/rich_description fused with vectors (RRF)
+HYBRID_SEARCH = os.getenv('HYBRID_SEARCH', 'true').lower() == 'true'
+HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', '20'))
+RRF_K = int(os.getenv('RRF_K', '60'))
+
+# Second-stage re-ranking of the candidate pool with a CPU cross-encoder
+RERANK_ENABLED = os.getenv('RERANK_ENABLED', 'false').lower() == 'true'
+RERANK_MODEL_NAME = os.getenv('RERANK_MODEL_NAME', 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1')
+RERANK_CANDIDATES = int(os.getenv('RERANK_CANDIDATES', '50'))
+# Re-ranking is truncated (or skipped) when scoring the pool would exceed this budget
+RERANK_BUDGET_MS = float(os.getenv('RERANK_BUDGET_MS', '150'))
+# Products passed to the recommendation prompt
+SEARCH_RESULTS = int(os.getenv('SEARCH_RESULTS', '4'))
+
+# Query embedding / search result caches
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '1024'))
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '3600'))
+
 # Logging configuration
+# Log records buffered for the background logging thread (write_behind.configure_logging)
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
 LOGGING_CONFIG = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -0,0 +1,79 @@
+import json
+from typing import Dict, List, Optional
+from .config import CONTEXT_MAX_TURNS, CONTEXT_TOKEN_BUDGET
+
+class ConversationContext:
+    """Fenêtre de contexte bornée envoyée à Mistral à chaque tour.
+
+    Les `max_turns` derniers tours sont gardés tels quels; les tours plus anciens
+    sont remplacés par un résumé construit à partir des préférences déjà
+    extraites. Le tout respecte un budget de tokens par requête, de sorte que la
+    taille du prompt ne croît pas avec la longueur de la conversation.
+    """
+
+    # Approximation du nombre de caractères par token (pas de tokenizer local)
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, max_turns: int = CONTEXT_MAX_TURNS, token_budget: int = CONTEXT_TOKEN_BUDGET):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+
+    @classmethod
+    def estimate_tokens(cls, messages: List[Dict]) -> int:
+        """Estime le nombre de tokens d'une liste de messages."""
+        return sum(len(m["content"]) // cls.CHARS_PER_TOKEN + 4 for m in messages)
+
+    @staticmethod
+    def _summary(preferences: Dict[str, str]) -> Optional[Dict]:
+        """Message système résumant les tours qui ne sont plus envoyés."""
+        known = {k: v for k, v in (preferences or {}).items() if v}
+        if not known:
+            return None
+        return {
+            "role": "system",
+            "content": "Informations déjà collectées lors des échanges précédents: "
+                       + json.dumps(known, ensure_ascii=False)
+        }
+
+    def build(self, messages: List[Dict], preferences: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Construit les messages à envoyer : prompt système, résumé et derniers tours."""
+        head = messages[:1] if messages and messages[0]["role"] == "system" else []
+        dialogue = [m for m in messages[len(head):] if m["role"] in ("user", "assistant")]
+
+        # Un tour = un message utilisateur et la réponse de l'assistant
+        recent = dialogue[-2 * self.max_turns:] if self.max_turns > 0 else dialogue[-1:]
+        summary = self._summary(preferences) if len(recent) < len(dialogue) else None
+        prefix = head + ([summary] if summary else [])
+
+        # Retirer les tours les plus anciens tant que le budget est dépassé,
+        # en gardant toujours le dernier message
+        while len(recent) > 1 and self.estimate_tokens(prefix + recent) > self.token_budget:
+            recent = recent[1:]
+            if summary is None:
+                summary = self._summary(preferences)
+                prefix = head + ([summary] if summary else [])
+
+        # La fenêtre commence toujours par un message utilisateur
+        while len(recent) > 1 and recent[0]["role"] != "user":
+            recent = recent[1:]
+
+        return prefix + recent
+
+    def extraction_input(self, messages: List[Dict], preferences: Optional[Dict[str, str]] = None) -> str:
+        """Texte transmis à l'extraction : préférences connues et derniers messages utilisateur."""
+        user_messages = [m["content"] for m in messages if m["role"] == "user"]
+        recent = user_messages[-self.max_turns:] if self.max_turns > 0 else user_messages[-1:]
+        known = {k: v for k, v in (preferences or {}).items() if v}
+
+        def render(recent_messages):
+            lines = list(recent_messages)
+            if known and len(recent_messages) < len(user_messages):
+                lines.insert(0, "Informations déjà connues: " + json.dumps(known, ensure_ascii=False))
+            return "\n".join(lines)
+
+        # Même budget que pour la conversation, en gardant le dernier message
+        text = render(recent)
+        while len(recent) > 1 and len(text) // self.CHARS_PER_TOKEN > self.token_budget:
+            recent = recent[1:]
+            text = render(recent)
+        return text
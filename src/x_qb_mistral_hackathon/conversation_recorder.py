@@ -0,0 +1,76 @@
+"""Enregistrement des conversations pour les rejouer en test de charge.
+
+Chaque tour est ajouté en une ligne JSON : session, numéro de tour, message
+utilisateur, réponse, préférences extraites, identifiants des produits
+retrouvés, filtres et durées par étape. `load_sessions` relit le fichier pour
+`benchmarks/replay_conversations.py`.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from .config import CONVERSATION_LOG_PATH
+
+class ConversationRecorder:
+    """Journal JSONL des tours de conversation, partagé entre les sessions (thread-safe)."""
+
+    def __init__(self, path: str = CONVERSATION_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record_turn(self, session_id: str, messages: List[Dict], response: str,
+                    preferences: Optional[Dict] = None, recommendations: Optional[List[Dict]] = None,
+                    filters: Optional[Dict] = None, timings: Optional[Dict[str, float]] = None,
+                    time_to_first_token: Optional[float] = None):
+        """Ajoute le dernier tour de `messages` (le message utilisateur suivi de `response`)."""
+        user_messages = [m['content'] for m in messages if m.get('role') == 'user']
+        entry = {
+            'session_id': session_id,
+            'turn': len(user_messages),
+            'timestamp': time.time(),
+            'user_message': user_messages[-1] if user_messages else '',
+            'response': response,
+            'preferences': preferences or {},
+            'product_ids': [str(p['id']) for p in recommendations or [] if 'id' in p],
+            'filters': filters or {},
+            'timings': timings or {},
+            'time_to_first_token': time_to_first_token
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+def load_sessions(path: str = CONVERSATION_LOG_PATH) -> Dict[str, List[Dict]]:
+    """Tours enregistrés, groupés par session et triés par numéro de tour."""
+    sessions = defaultdict(list)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Ligne tronquée (arrêt pendant l'écriture)
+                continue
+            sessions[entry['session_id']].append(entry)
+    for turns in sessions.values():
+        turns.sort(key=lambda entry: entry['turn'])
+    return dict(sessions)
+
+_default_recorder: Optional[ConversationRecorder] = None
+_default_recorder_lock = threading.Lock()
+
+def get_default_recorder() -> ConversationRecorder:
+    """Journal partagé par toutes les sessions du processus."""
+    global _default_recorder
+    with _default_recorder_lock:
+        if _default_recorder is None:
+            _default_recorder = ConversationRecorder()
+    return _default_recorder
@@ -1,14 +1,32 @@
 # app/data_loader.py
 import pandas as pd
+import numpy as np
+import hashlib
+import json
 import os
 import logging
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+from .config import CATALOG_CACHE_ENABLED, CATALOG_CHUNK_SIZE, GIFTS_DATA_PATH
 
 logger = logging.getLogger(__name__)
 
+# Version of the normalized schema stored in the columnar cache: bump it to force a rebuild
+CATALOG_SCHEMA_VERSION = 2
+
+# Number of bins of the price histogram in the catalog statistics
+PRICE_HISTOGRAM_BINS = 20
+
 class DataLoader:
-    def __init__(self, data_path: str = None):
-        """Initialize the DataLoader with the path to the gift dataset."""
+    def __init__(self, data_path: str = None, use_cache: bool = CATALOG_CACHE_ENABLED):
+        """Initialize the DataLoader with the path to the gift dataset (CSV or Parquet).
+
+        Defaults to GIFTS_DATA_PATH when set, then to the usual data_gifts.csv locations.
+        """
+        self.use_cache = use_cache
+        # Statistics of the last loaded catalog (categories, prices, ratings)
+        self.catalog_stats: Optional[dict] = None
+        if data_path is None and GIFTS_DATA_PATH:
+            data_path = GIFTS_DATA_PATH
         if data_path is None:
             # Try multiple possible paths
             possible_paths = [
@@ -30,8 +48,14 @@ class DataLoader:
         else:
             self.data_path = data_path
 
-    def load_amazon_dataset(self) -> Optional[pd.DataFrame]:
-        """Load and prepare the gift dataset."""
+    def load_amazon_dataset(self, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Load and prepare the gift dataset.
+
+        The normalized catalog is cached in a columnar Arrow file next to the
+        CSV and memory-mapped on later loads; the cache is rebuilt whenever
+        the source CSV changes. With `columns`, only those columns (the ones
+        that exist) are returned, and only those are read from the cache.
+        """
         try:
             logger.info(f"Attempting to load dataset from: {self.data_path}")
             
@@ -41,61 +65,19 @@ class DataLoader:
                 logger.info(f"Current working directory: {os.getcwd()}")
                 logger.info(f"Directory contents: {os.listdir('.')}")
                 raise FileNotFoundError(f"Dataset not found at {self.data_path}")
-            
-            # Try different encodings
-            encodings = ['latin1', 'utf-8', 'utf-8-sig']
-            df = None
-            
-            for encoding in encodings:
-                try:
-                    logger.info(f"Trying to read CSV with encoding: {encoding}")
-                    df = pd.read_csv(self.data_path, sep=';', encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error with encoding {encoding}: {str(e)}")
-                    continue
-            
-            if df is None:
-                raise ValueError("Could not read the CSV file with any encoding")
 
-            # Log the column names we found
-            logger.info(f"Columns found in dataset: {df.columns.tolist()}")
-            
-            # Add rich description if it doesn't exist
-            if 'rich_description' not in df.columns:
-                df['rich_description'] = df.apply(
-                    lambda row: f"{row['name_of_the_product']} - {row['main_category']} - {row['sub_category']}", 
-                    axis=1
-                )
-
-            # Rename columns if needed
-            column_mapping = {
-                'name_of_the_product': 'name',
-                'discounted_price': 'discount_price'
-            }
-            df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
-            
-            # Clean price columns
-            for col in ['discount_price', 'actual_price']:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].apply(lambda x: str(x).replace('₹', '').replace(',', '')).astype(float)
-
-            # Add gift category if it doesn't exist
-            if 'gift_category' not in df.columns:
-                df['gift_category'] = df['main_category']
-
-            # Validate the final dataframe
-            required_columns = ['name', 'main_category', 'sub_category', 'discount_price', 'actual_price', 'ratings']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                logger.error(f"Missing required columns: {missing_columns}")
-                raise ValueError(f"Dataset missing required columns: {missing_columns}")
+            df = self._load_columnar_cache(columns) if self.use_cache else None
+            if df is None:
+                df = self._normalize(self._read_source())
+                self.catalog_stats = self.compute_catalog_stats(df)
+                if self.use_cache:
+                    self._write_columnar_cache(df)
+                if columns is not None:
+                    df = df[[col for col in columns if col in df.columns]]
 
             logger.info(f"Successfully loaded {len(df)} products")
-            logger.info(f"Sample of data:\n{df.head()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sample of data:\n{df.head()}")
             
             return df
 
@@ -103,15 +85,293 @@ class DataLoader:
             logger.error(f"Error loading dataset: {str(e)}", exc_info=True)
             return None
 
+    def iter_catalog_chunks(self, chunksize: int = CATALOG_CHUNK_SIZE,
+                            columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Yield the normalized catalog in chunks of at most `chunksize` rows.
+
+        Batches are read from the memory-mapped columnar cache when it is up to
+        date, otherwise the CSV is streamed and each chunk normalized on the
+        fly; only one chunk is materialized at a time. `columns` works as in
+        `load_amazon_dataset`.
+        """
+        if not os.path.exists(self.data_path):
+            raise FileNotFoundError(f"Dataset not found at {self.data_path}")
+
+        cached = self._open_columnar_cache() if self.use_cache else None
+        if cached is not None:
+            table, _ = cached
+            for batch in self._select(table, columns).to_batches(max_chunksize=chunksize):
+                yield batch.to_pandas()
+            return
+
+        if self._is_parquet:
+            import pyarrow.parquet as pq
+
+            chunks = (batch.to_pandas() for batch in pq.ParquetFile(self.data_path).iter_batches(chunksize))
+        else:
+            chunks = self._read_csv_chunks(chunksize)
+        for chunk in chunks:
+            chunk = self._normalize(chunk)
+            yield chunk if columns is None else chunk[[col for col in columns if col in chunk.columns]]
+
+    @property
+    def _is_parquet(self) -> bool:
+        return self.data_path.endswith('.parquet')
+
+    def _read_source(self) -> pd.DataFrame:
+        """Read the whole source catalog (CSV or Parquet)."""
+        if self._is_parquet:
+            return pd.read_parquet(self.data_path)
+        return self._read_csv()
+
+    def _read_csv_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream the source CSV, picking the first encoding that decodes its first chunk."""
+        for encoding in ['latin1', 'utf-8', 'utf-8-sig']:
+            try:
+                reader = pd.read_csv(self.data_path, sep=';', encoding=encoding, chunksize=chunksize)
+                first = next(reader, None)
+            except UnicodeDecodeError:
+                continue
+            if first is not None:
+                yield first
+            yield from reader
+            return
+        raise ValueError("Could not read the CSV file with any encoding")
+
+    def _read_csv(self) -> pd.DataFrame:
+        """Read the source CSV, trying several encodings."""
+        encodings = ['latin1', 'utf-8', 'utf-8-sig']
+        df = None
+        
+        for encoding in encodings:
+            try:
+                logger.info(f"Trying to read CSV with encoding: {encoding}")
+                df = pd.read_csv(self.data_path, sep=';', encoding=encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+            except Exception as e:
+                logger.error(f"Error with encoding {encoding}: {str(e)}")
+                continue
+        
+        if df is None:
+            raise ValueError("Could not read the CSV file with any encoding")
+
+        # Log the column names we found
+        logger.info(f"Columns found in dataset: {df.columns.tolist()}")
+        return df
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize the raw catalog to the schema used by the application."""
+        # Add rich description if it doesn't exist
+        if 'rich_description' not in df.columns:
+            df['rich_description'] = (
+                df['name_of_the_product'].astype(str) + ' - '
+                + df['main_category'].astype(str) + ' - '
+                + df['sub_category'].astype(str)
+            )
+
+        # Rename columns if needed
+        column_mapping = {
+            'name_of_the_product': 'name',
+            'discounted_price': 'discount_price'
+        }
+        df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
+        
+        # Clean price columns
+        for col in ['discount_price', 'actual_price']:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = (df[col].astype(str)
+                           .str.replace('₹', '', regex=False)
+                           .str.replace(',', '', regex=False)
+                           .astype(float))
+
+        # Add gift category if it doesn't exist
+        if 'gift_category' not in df.columns:
+            df['gift_category'] = df['main_category']
+
+        # Validate the final dataframe
+        required_columns = ['name', 'main_category', 'sub_category', 'discount_price', 'actual_price', 'ratings']
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        
+        if missing_columns:
+            logger.error(f"Missing required columns: {missing_columns}")
+            raise ValueError(f"Dataset missing required columns: {missing_columns}")
+
+        return df
+
+    @staticmethod
+    def compute_catalog_stats(df: pd.DataFrame) -> dict:
+        """Compute categories, price and rating distributions in a single pass over the catalog."""
+        prices = df['discount_price'].dropna().to_numpy(dtype=float)
+        ratings = pd.to_numeric(df['ratings'], errors='coerce').dropna()
+
+        if len(prices):
+            counts, edges = np.histogram(prices, bins=PRICE_HISTOGRAM_BINS)
+            price_min, price_max = float(prices.min()), float(prices.max())
+        else:
+            counts, edges = np.array([], dtype=int), np.array([])
+            price_min, price_max = 0.0, 1000000.0
+
+        return {
+            'n_products': int(len(df)),
+            'main_categories': sorted(df['main_category'].dropna().astype(str).unique().tolist()),
+            'gift_categories': sorted(df['sub_category'].dropna().astype(str).unique().tolist()),
+            'price_min': price_min,
+            'price_max': price_max,
+            'price_histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+            # Ratings rounded to the nearest star
+            'rating_distribution': {
+                str(int(rating)): int(count)
+                for rating, count in ratings.round().value_counts().sort_index().items()
+            },
+            'category_counts': {
+                str(k): int(v) for k, v in df['main_category'].value_counts().sort_index().items()
+            },
+            'sub_category_counts': {
+                str(k): int(v) for k, v in df['sub_category'].value_counts().sort_index().items()
+            }
+        }
+
+    @property
+    def cache_path(self) -> str:
+        """Path of the columnar copy of the normalized catalog."""
+        return os.path.splitext(self.data_path)[0] + '.arrow'
+
+    @property
+    def cache_meta_path(self) -> str:
+        """Path of the sidecar describing the source the cache was built from."""
+        return self.cache_path + '.json'
+
+    def _source_fingerprint(self, with_hash: bool = True) -> dict:
+        """Size, modification time and (optionally) SHA-256 of the source CSV."""
+        stat = os.stat(self.data_path)
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if with_hash:
+            digest = hashlib.sha256()
+            with open(self.data_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            fingerprint['sha256'] = digest.hexdigest()
+        return fingerprint
+
+    def _fresh_cache_meta(self) -> Optional[dict]:
+        """Sidecar of the cache if it matches the source CSV (mtime/size first, then content hash)."""
+        if not (os.path.exists(self.cache_path) and os.path.exists(self.cache_meta_path)):
+            return None
+        with open(self.cache_meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('schema_version') != CATALOG_SCHEMA_VERSION:
+            return None
+
+        fingerprint = self._source_fingerprint(with_hash=False)
+        if fingerprint['size'] == meta.get('size') and fingerprint['mtime_ns'] == meta.get('mtime_ns'):
+            return meta
+
+        # Touched but possibly unchanged (checkout, copy): compare contents
+        fingerprint = self._source_fingerprint()
+        if fingerprint['sha256'] != meta.get('sha256'):
+            return None
+        self._write_cache_meta(fingerprint, meta.get('stats'))
+        return meta
+
+    def _open_columnar_cache(self) -> Optional[tuple]:
+        """Memory-map the columnar catalog if it is up to date with the CSV.
+
+        Returns the Arrow table and its sidecar metadata, or None.
+        """
+        try:
+            import pyarrow.feather as feather
+        except ImportError:
+            logger.warning("pyarrow is not installed, reading the CSV catalog")
+            return None
+
+        try:
+            meta = self._fresh_cache_meta()
+            if meta is None:
+                return None
+            table = feather.read_table(self.cache_path, memory_map=True)
+            logger.info(f"Opened columnar catalog cache: {self.cache_path}")
+            return table, meta
+        except Exception as e:
+            logger.warning(f"Could not read the columnar cache, reading the CSV catalog: {e}")
+            return None
+
+    @staticmethod
+    def _select(table, columns: Optional[List[str]]):
+        """Project an Arrow table on the requested columns that exist (no copy)."""
+        if columns is None:
+            return table
+        return table.select([col for col in columns if col in table.column_names])
+
+    def _load_columnar_cache(self, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Load the catalog from the columnar cache, or None if it is unavailable.
+
+        Converting to pandas copies the memory-mapped columns into the heap
+        (strings become Python objects), so only the requested columns are
+        converted. The statistics come from the sidecar metadata.
+        """
+        cached = self._open_columnar_cache()
+        if cached is None:
+            return None
+        table, meta = cached
+        stats = meta.get('stats')
+        if stats is None:
+            stats = self.compute_catalog_stats(
+                self._select(table, ['discount_price', 'ratings', 'main_category', 'sub_category']).to_pandas()
+            )
+        df = self._select(table, columns).to_pandas(split_blocks=True)
+        self.catalog_stats = stats
+        return df
+
+    def _write_columnar_cache(self, df: pd.DataFrame):
+        """Write the normalized catalog as an uncompressed Arrow file (memory-mappable)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+        except ImportError:
+            return
+
+        try:
+            fingerprint = self._source_fingerprint()
+            tmp_path = self.cache_path + '.tmp'
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                                  compression='uncompressed')
+            os.replace(tmp_path, self.cache_path)
+            self._write_cache_meta(fingerprint, self.catalog_stats)
+            logger.info(f"Wrote columnar catalog cache: {self.cache_path}")
+        except Exception as e:
+            logger.warning(f"Could not write the columnar cache: {e}")
+
+    def _write_cache_meta(self, fingerprint: dict, stats: Optional[dict]):
+        meta = dict(fingerprint, schema_version=CATALOG_SCHEMA_VERSION, source=self.data_path,
+                    stats=stats)
+        tmp_path = self.cache_meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.cache_meta_path)
+
+    def _ensure_stats(self) -> dict:
+        """Catalog statistics, loading the catalog if it has not been loaded yet.
+
+        No column is kept: with a fresh columnar cache the statistics are read
+        from its metadata; otherwise the source is read once, which also
+        rebuilds the cache.
+        """
+        if self.catalog_stats is None and self.load_amazon_dataset(columns=[]) is None:
+            raise ValueError("Catalog could not be loaded")
+        return self.catalog_stats
+
     def get_categories(self) -> dict:
         """Get available categories from the dataset."""
         try:
-            df = pd.read_csv(self.data_path, sep=';', encoding='latin1')
+            stats = self._ensure_stats()
             categories = {
-                'main_categories': sorted(df['main_category'].unique().tolist()),
-                'gift_categories': sorted(df['sub_category'].unique().tolist())
+                'main_categories': stats['main_categories'],
+                'gift_categories': stats['gift_categories']
             }
-            logger.info(f"Found categories: {categories}")
+            logger.debug(f"Found categories: {categories}")
             return categories
         except Exception as e:
             logger.error(f"Error getting categories: {str(e)}")
@@ -120,16 +380,10 @@ class DataLoader:
     def get_price_range(self) -> Tuple[float, float]:
         """Get the price range from the dataset."""
         try:
-            df = pd.read_csv(self.data_path, sep=';', encoding='latin1')
-            if 'discounted_price' in df.columns:
-                price_col = 'discounted_price'
-            else:
-                price_col = 'discount_price'
-                
-            prices = df[price_col].astype(str).str.replace('₹', '').str.replace(',', '').astype(float)
-            price_range = (prices.min(), prices.max())
-            logger.info(f"Price range found: {price_range}")
+            stats = self._ensure_stats()
+            price_range = (stats['price_min'], stats['price_max'])
+            logger.debug(f"Price range found: {price_range}")
             return price_range
         except Exception as e:
             logger.error(f"Error getting price range: {str(e)}")
-            return (0.0, 1000000.0)
\ No newline at end of file
+            return (0.0, 1000000.0)
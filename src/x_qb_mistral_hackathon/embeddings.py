@@ -0,0 +1,130 @@
+"""Runtimes d'embedding : PyTorch fp32 ou modèle ONNX quantifié int8 (CPU).
+
+Vérification du recouvrement top-k du modèle quantifié par rapport au fp32
+sur le catalogue :
+
+    python -m x_qb_mistral_hackathon.embeddings --sample 2000 --k 10
+"""
+import argparse
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import numpy as np
+from .config import (EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_PATH, EMBEDDING_OVERLAP_THRESHOLD,
+                     EMBEDDING_QUANTIZATION, EMBEDDING_RUNTIME)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+RUNTIMES = ('torch', 'onnx-int8')
+
+def embedding_model_key(model_name: str = EMBEDDING_MODEL_NAME, runtime: str = EMBEDDING_RUNTIME) -> str:
+    """Identifie les vecteurs produits : changer de runtime impose de ré-encoder le catalogue."""
+    if runtime == 'torch':
+        return model_name
+    return f"{model_name}:{runtime}:{EMBEDDING_QUANTIZATION}"
+
+def _quantized_model_dir(model_name: str) -> str:
+    return os.path.join(EMBEDDING_ONNX_PATH, model_name.replace('/', '__'))
+
+def _quantized_file_name() -> str:
+    return f"onnx/model_qint8_{EMBEDDING_QUANTIZATION}.onnx"
+
+def export_quantized_model(model_name: str = EMBEDDING_MODEL_NAME) -> str:
+    """Exporte le modèle en ONNX quantifié int8 (une seule fois) et renvoie son dossier."""
+    model_dir = _quantized_model_dir(model_name)
+    if os.path.exists(os.path.join(model_dir, _quantized_file_name())):
+        return model_dir
+
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    print(f"Export du modèle {model_name} en ONNX int8 ({EMBEDDING_QUANTIZATION})...")
+    model = SentenceTransformer(model_name, backend='onnx', device='cpu')
+    model.save_pretrained(model_dir)
+    export_dynamic_quantized_onnx_model(model, EMBEDDING_QUANTIZATION, model_dir)
+    return model_dir
+
+def load_embedding_model(model_name: str = EMBEDDING_MODEL_NAME,
+                         runtime: str = EMBEDDING_RUNTIME,
+                         threads: Optional[int] = None) -> 'SentenceTransformer':
+    """Charge le modèle d'embedding avec le runtime demandé.
+
+    `threads` limite le nombre de threads de calcul du runtime (torch ou
+    ONNX Runtime); par défaut chaque runtime utilise tous les cœurs.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if runtime == 'torch':
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformer(model_name, device='cpu')
+    if runtime == 'onnx-int8':
+        model_kwargs = {'file_name': _quantized_file_name()}
+        if threads:
+            # torch.set_num_threads n'a pas d'effet sur ONNX Runtime
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs['session_options'] = session_options
+        return SentenceTransformer(
+            export_quantized_model(model_name), backend='onnx', device='cpu',
+            model_kwargs=model_kwargs
+        )
+    raise ValueError(f"Runtime d'embedding inconnu : {runtime} (attendu : {', '.join(RUNTIMES)})")
+
+def _top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices des k documents les plus proches (cosinus) de chaque requête."""
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    return np.argpartition(-scores, min(k, corpus.shape[0] - 1), axis=1)[:, :k]
+
+def top_k_overlap(reference: 'SentenceTransformer', candidate: 'SentenceTransformer',
+                  documents: Sequence[str], queries: Sequence[str], k: int = 10) -> float:
+    """Recouvrement moyen des k premiers résultats obtenus avec les deux modèles (entre 0 et 1)."""
+    k = min(k, len(documents))
+    reference_top = _top_k(reference.encode(list(documents), batch_size=64),
+                           reference.encode(list(queries)), k)
+    candidate_top = _top_k(candidate.encode(list(documents), batch_size=64),
+                           candidate.encode(list(queries)), k)
+    return float(np.mean([
+        len(set(a) & set(b)) / k for a, b in zip(reference_top, candidate_top)
+    ]))
+
+def check_quantized_overlap(documents: Sequence[str], queries: Sequence[str], k: int = 10,
+                            threshold: float = EMBEDDING_OVERLAP_THRESHOLD,
+                            model_name: str = EMBEDDING_MODEL_NAME) -> Dict[str, float]:
+    """Compare le modèle int8 au modèle fp32 sur le catalogue."""
+    overlap = top_k_overlap(load_embedding_model(model_name, 'torch'),
+                            load_embedding_model(model_name, 'onnx-int8'),
+                            documents, queries, k)
+    return {'k': k, 'overlap': overlap, 'threshold': threshold, 'passed': overlap >= threshold}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .data_loader import DataLoader
+    from .rag_engine import RAGEngine
+
+    parser = argparse.ArgumentParser(description="Vérifie le modèle d'embedding int8 par rapport au fp32.")
+    parser.add_argument('--data-path', default=None)
+    parser.add_argument('--sample', type=int, default=2000, help="produits du catalogue comparés")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--threshold', type=float, default=EMBEDDING_OVERLAP_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    df = DataLoader(args.data_path).load_amazon_dataset()
+    if df is None:
+        print("Catalogue introuvable")
+        return 1
+    df = df.sample(min(args.sample, len(df)), random_state=0)
+    documents = [RAGEngine._create_search_description(row) for row in df.to_dict('records')]
+    # Requêtes de la même forme que celles du chatbot
+    queries = [f"Cadeau pour quelqu'un qui aime {sub}" for sub in df['sub_category'].astype(str).unique()]
+
+    result = check_quantized_overlap(documents, queries, args.k, args.threshold)
+    print(f"Recouvrement top-{result['k']} int8/fp32 : {result['overlap']:.3f} "
+          f"(seuil {result['threshold']:.2f}) -> {'OK' if result['passed'] else 'ÉCHEC'}")
+    return 0 if result['passed'] else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+"""Serveur local imitant l'API chat completions de Mistral, pour les tests de charge.
+
+    python -m x_qb_mistral_hackathon.fake_mistral_server --port 8089 --latency-ms 400 \\
+        --tokens-per-second 60 --error-rate 0.01
+
+puis `MISTRAL_SERVER_URL=http://127.0.0.1:8089` (et une clé `MISTRAL_API_KEY`
+quelconque) pour y diriger `GiftChatbot` et `mistral_integration`. Les
+réponses `chat.complete` et `chat.stream` (SSE) du client `mistralai` sont
+prises en charge; le prompt d'extraction et les appels en mode JSON
+reçoivent des préférences complètes.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import numpy as np
+from .chatbot import EXTRACTION_PROMPT
+
+CANNED_REPLY = (
+    "Voici quatre idées de cadeaux adaptées : un coffret de dégustation de thés, "
+    "un livre de recettes du monde, une enceinte Bluetooth compacte et un atelier "
+    "de cuisine à partager. Chacune correspond à ses centres d'intérêt et reste "
+    "dans le budget indiqué. Souhaitez-vous d'autres suggestions ?"
+)
+
+class FakeMistralConfig:
+    """Distribution des délais, débit de tokens et taux d'erreur du serveur."""
+
+    def __init__(self, latency_ms: float = 300.0, latency_sigma: float = 0.5,
+                 tokens_per_second: float = 50.0, error_rate: float = 0.0,
+                 error_status: int = 429, seed: Optional[int] = None):
+        # Délai avant le premier token : loi log-normale de médiane `latency_ms`
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Délai avant le premier token, en secondes."""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._rng_lock:
+            return float(self._rng.lognormal(np.log(self.latency_ms / 1000), self.latency_sigma))
+
+    def sample_error(self) -> bool:
+        with self._rng_lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+def canned_content(messages: List[Dict], response_format: Optional[dict] = None) -> str:
+    """Réponse simulée : préférences (JSON) pour l'extraction et le mode structuré, texte sinon."""
+    last_user = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+    preferences = {
+        'description': "un proche",
+        'price_range': "50-100€",
+        'interests': str(last_user)[:80] or "la cuisine",
+        'context': "anniversaire",
+        'gift_type': ""
+    }
+    if messages and messages[0].get('content') == EXTRACTION_PROMPT:
+        return json.dumps(preferences, ensure_ascii=False)
+    if response_format and response_format.get('type') == 'json_object':
+        return json.dumps({'reply': CANNED_REPLY, 'preferences': preferences}, ensure_ascii=False)
+    return CANNED_REPLY
+
+def _tokens(content: str) -> List[str]:
+    words = content.split(' ')
+    return [word + ' ' for word in words[:-1]] + words[-1:]
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeMistral/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.stats())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'object': 'error', 'message': 'Not found'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._send_json(404, {'object': 'error', 'message': 'Not found'})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        config: FakeMistralConfig = self.server.config
+        self.server.count('requests')
+
+        time.sleep(config.sample_latency())
+        if config.sample_error():
+            self.server.count('errors')
+            self._send_json(config.error_status, {
+                'object': 'error', 'message': 'Simulated error', 'type': 'simulated', 'code': config.error_status
+            })
+            return
+
+        content = canned_content(request.get('messages', []), request.get('response_format'))
+        tokens = _tokens(content)
+        prompt_tokens = sum(len(str(m.get('content', ''))) // 4 for m in request.get('messages', []))
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                 'total_tokens': prompt_tokens + len(tokens)}
+        meta = {'id': uuid.uuid4().hex, 'created': int(time.time()),
+                'model': request.get('model', 'mistral-small-latest')}
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+        if request.get('stream'):
+            self.server.count('streams')
+            self._stream(tokens, meta, usage, token_delay)
+            return
+
+        time.sleep(token_delay * len(tokens))
+        self._send_json(200, dict(meta, object='chat.completion', usage=usage, choices=[{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content, 'tool_calls': None},
+            'finish_reason': 'stop'
+        }]))
+
+    def _stream(self, tokens: List[str], meta: dict, usage: dict, token_delay: float):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload):
+            self.wfile.write(f"data: {payload}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(token_delay)
+                last = i == len(tokens) - 1
+                chunk = dict(meta, object='chat.completion.chunk', choices=[{
+                    'index': 0,
+                    'delta': dict({'content': token}, **({'role': 'assistant'} if i == 0 else {})),
+                    'finish_reason': 'stop' if last else None
+                }])
+                if last:
+                    chunk['usage'] = usage
+                send(json.dumps(chunk, ensure_ascii=False))
+            send('[DONE]')
+        except (BrokenPipeError, ConnectionResetError):
+            # Le client a interrompu la lecture du flux
+            self.server.count('aborted_streams')
+
+class FakeMistralServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread; `start()` le lance en arrière-plan (tests, benchmarks)."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8089,
+                 config: Optional[FakeMistralConfig] = None):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeMistralConfig()
+        self._counters: Dict[str, int] = {}
+        self._counters_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str):
+        with self._counters_lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def start(self) -> 'FakeMistralServer':
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-mistral", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API chat completions de Mistral.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=300.0,
+                        help="délai médian avant le premier token (loi log-normale)")
+    parser.add_argument('--latency-sigma', type=float, default=0.5,
+                        help="dispersion de la loi log-normale des délais")
+    parser.add_argument('--tokens-per-second', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="proportion de requêtes en erreur")
+    parser.add_argument('--error-status', type=int, default=429)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = FakeMistralConfig(args.latency_ms, args.latency_sigma, args.tokens_per_second,
+                               args.error_rate, args.error_status, args.seed)
+    server = FakeMistralServer(args.host, args.port, config)
+    print(f"Faux serveur Mistral sur {server.url} (MISTRAL_SERVER_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Version du format de l'index persisté (et de `tokenize`) : l'incrémenter force sa reconstruction
+LEXICAL_INDEX_VERSION = 1
+
+# Mots vides français et anglais, ignorés à l'indexation comme à la recherche
+STOPWORDS = frozenset("""
+a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me
+meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te
+tes toi ton tu un une vos votre vous c d j l m n s t y est sont aime aiment cadeau
+the of and or to in for with on at by an is are this that from it as be
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes normalisés (minuscules, sans accents ni mots vides)."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+def text_hash(text: str) -> str:
+    """Empreinte d'un texte, stable d'un processus à l'autre (contrairement à `hash`)."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+class BM25Index:
+    """Index inversé BM25 en mémoire, mis à jour produit par produit.
+
+    Les termes présents dans plus de `max_df_ratio` des documents portent très
+    peu d'information et ne sont pas parcourus à la recherche. Les autres sont
+    parcourus du plus au moins discriminant (MaxScore) : dès qu'aucun document
+    encore absent des candidats ne peut entrer dans les `k` premiers, les
+    termes restants ne mettent plus à jour que les candidats.
+
+    L'index peut être écrit sur disque (`save`) et rechargé (`load`) pour ne
+    pas re-tokeniser tout le catalogue à chaque démarrage.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_df_ratio: float = 0.2):
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        # Par terme : tf maximal et longueur minimale de ses documents, qui
+        # bornent sa contribution au score (bornes restant valides après un retrait)
+        self._term_bounds: Dict[str, Tuple[int, int]] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_texts: Dict[str, str] = {}
+        self._total_length = 0
+        # Modifié depuis le dernier `save` ou `load`
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def doc_ids(self) -> List[str]:
+        """Identifiants des documents indexés."""
+        return list(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str):
+        """Ajoute ou remplace un document; sans effet si son texte n'a pas changé."""
+        digest = text_hash(text)
+        if self._doc_texts.get(doc_id) == digest:
+            return
+        self.remove(doc_id)
+
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        for term, tf in counts.items():
+            self._postings[term][doc_id] = tf
+            max_tf, min_length = self._term_bounds.get(term, (tf, length))
+            self._term_bounds[term] = (max(max_tf, tf), min(min_length, length))
+        self._doc_terms[doc_id] = tuple(counts)
+        self._doc_lengths[doc_id] = length
+        self._doc_texts[doc_id] = digest
+        self._total_length += length
+        self.dirty = True
+
+    def remove(self, doc_id: str):
+        """Retire un document de l'index."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._term_bounds[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._doc_texts.pop(doc_id, None)
+        self.dirty = True
+
+    def fingerprint(self) -> str:
+        """Empreinte du contenu indexé (identifiants et textes des documents)."""
+        digest = hashlib.blake2b(digest_size=16)
+        for doc_id in sorted(self._doc_texts):
+            digest.update(f"{doc_id}\t{self._doc_texts[doc_id]}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def save(self, path: str):
+        """Écrit l'index dans `path` (JSON, écriture atomique), avec son empreinte."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # json.dumps puis une seule écriture : bien plus rapide que json.dump
+            f.write(json.dumps({
+                'version': LEXICAL_INDEX_VERSION,
+                'fingerprint': self.fingerprint(),
+                'postings': self._postings,
+                'term_bounds': self._term_bounds,
+                'doc_terms': self._doc_terms,
+                'doc_lengths': self._doc_lengths,
+                'doc_texts': self._doc_texts
+            }, ensure_ascii=False, separators=(',', ':')))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> Optional['BM25Index']:
+        """Recharge un index écrit par `save`; None s'il est absent ou d'une autre version."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != LEXICAL_INDEX_VERSION:
+            return None
+
+        index = cls(**kwargs)
+        index._postings = defaultdict(dict, data['postings'])
+        index._term_bounds = {term: tuple(bound) for term, bound in data['term_bounds'].items()}
+        index._doc_terms = data['doc_terms']
+        index._doc_lengths = data['doc_lengths']
+        index._doc_texts = data['doc_texts']
+        index._total_length = sum(index._doc_lengths.values())
+        # L'index n'est valable que pour le contenu dont il porte l'empreinte
+        if index.fingerprint() != data.get('fingerprint'):
+            return None
+        return index
+
+    def _weight(self, idf: float, tf: int, length: int, avg_length: float) -> float:
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Renvoie les `k` documents les mieux classés pour la requête."""
+        n_docs = len(self._doc_lengths)
+        if n_docs == 0 or k <= 0:
+            return []
+        avg_length = self._total_length / n_docs
+        max_df = max(1, int(self.max_df_ratio * n_docs))
+
+        terms = []
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings or len(postings) > max_df:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            max_tf, min_length = self._term_bounds[term]
+            terms.append((self._weight(idf, max_tf, min_length, avg_length), idf, postings))
+        # Termes les plus discriminants d'abord
+        terms.sort(key=lambda term: term[0], reverse=True)
+
+        k1, b = self.k1, self.b
+        doc_lengths = self._doc_lengths
+        scores: Dict[str, float] = defaultdict(float)
+        remaining = sum(bound for bound, _, _ in terms)
+        candidates_only = False
+        for bound, idf, postings in terms:
+            if not candidates_only and len(scores) >= k:
+                # Un nouveau document ne peut pas dépasser la somme des bornes
+                # des termes restants : s'il ne peut pas battre le k-ième score,
+                # seuls les candidats actuels sont encore mis à jour
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                candidates_only = threshold > remaining
+            remaining -= bound
+
+            if not candidates_only:
+                matches = postings.items()
+            elif len(postings) <= len(scores):
+                matches = [(doc_id, tf) for doc_id, tf in postings.items() if doc_id in scores]
+            else:
+                matches = [(doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings]
+            for doc_id, tf in matches:
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+
+        if len(scores) <= k:
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60,
+                           limit: Optional[int] = None) -> List[str]:
+    """Fusionne plusieurs classements par Reciprocal Rank Fusion."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit is not None else fused
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from .config import LLM_CACHE_MAX_BYTES, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH
+
+class LLMCache:
+    """Cache persistant (SQLite) des réponses de Mistral.
+
+    Les entrées sont indexées par modèle, messages et paramètres de l'appel, et
+    évincées par ordre de dernière utilisation au-delà de `max_entries` entrées
+    ou `max_bytes` octets de réponses.
+    """
+
+    # Nombre d'écritures entre deux passes d'éviction
+    EVICTION_INTERVAL = 50
+    # Résolution de la date de dernière utilisation (secondes) : une lecture ne
+    # réécrit l'entrée que si sa date a plus de ACCESS_RESOLUTION secondes
+    ACCESS_RESOLUTION = 300
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], params: Optional[dict] = None) -> str:
+        """Clé d'un appel : empreinte du modèle, des messages et des paramètres."""
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'params': params or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Renvoie la réponse en cache, ou None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            response, last_access = row
+            now = time.time()
+        # L'éviction n'a besoin que d'un ordre approximatif : la plupart des
+        # succès ne font aucune écriture
+        if now - last_access > self.ACCESS_RESOLUTION:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        return response
+
+    def set(self, key: str, model: str, response: str):
+        """Enregistre une réponse."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode('utf-8')), now, now)
+            )
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà des limites."""
+        self._conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        self._conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS running_size
+                    FROM responses
+                ) WHERE running_size > ?
+            )
+        """, (self.max_bytes,))
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Taille du cache et taux de succès depuis le démarrage du processus."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_llm_cache() -> LLMCache:
+    """Cache partagé par tous les chatbots du processus."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+    return _default_cache
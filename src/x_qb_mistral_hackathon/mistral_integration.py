@@ -1,18 +1,26 @@
 
 import os
-from mistralai import Mistral
 from dotenv import load_dotenv
 
-# Load environment variables (e.g., API keys)
-load_dotenv(dotenv_path=".env")
-
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 MODEL = "mistral-small-latest"
 
-print(f"Loaded API key: {MISTRAL_API_KEY[:5]}****")  # Partial key for security
+_client = None
+
+def get_client():
+    """
+    Returns the Mistral client, created on first use.
+
+    The API key is read from the environment (or .env) at that point, so
+    importing this module has no side effects.
+    """
+    global _client
+    if _client is None:
+        from mistralai import Mistral
 
-# Initialize the Mistral client
-client = Mistral(api_key=MISTRAL_API_KEY)
+        # Load environment variables (e.g., API keys)
+        load_dotenv(dotenv_path=".env")
+        _client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"), server_url=os.getenv("MISTRAL_SERVER_URL"))
+    return _client
 
 def chat_with_mistral(messages):
     """
@@ -25,7 +33,7 @@ def chat_with_mistral(messages):
         str: The response text from the Mistral LLM.
     """
     try:
-        chat_response = client.chat.complete(model=MODEL, messages=messages)
+        chat_response = get_client().chat.complete(model=MODEL, messages=messages)
         return chat_response.choices[0].message.content
     except Exception as e:
         print(f"Error interacting with Mistral API: {e}")
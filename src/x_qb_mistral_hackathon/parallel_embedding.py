@@ -0,0 +1,92 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+import numpy as np
+from .config import EMBEDDING_MODEL_NAME, EMBEDDING_RUNTIME
+from .embeddings import export_quantized_model, load_embedding_model
+
+# Tailles de lot essayées pour le réglage automatique
+BATCH_SIZE_CANDIDATES = (16, 32, 64, 128)
+
+# Modèle et taille de lot propres à chaque processus du pool
+_worker_model = None
+_worker_batch_size: Optional[int] = None
+
+def _init_worker(model_name: str, threads: int, batch_size: Optional[int]):
+    """Charge le modèle une fois par processus, avec sa part des cœurs."""
+    global _worker_model, _worker_batch_size
+    _worker_model = load_embedding_model(model_name, threads=threads)
+    _worker_batch_size = batch_size
+
+def tune_batch_size(model, texts: Sequence[str],
+                    candidates: Sequence[int] = BATCH_SIZE_CANDIDATES) -> int:
+    """Choisit la taille de lot au meilleur débit mesuré sur un échantillon de textes."""
+    best_size, best_rate = candidates[0], 0.0
+    for batch_size in candidates:
+        sample = list(texts[:2 * batch_size])
+        if len(sample) < batch_size:
+            break
+        started = time.perf_counter()
+        model.encode(sample, batch_size=batch_size, show_progress_bar=False)
+        rate = len(sample) / (time.perf_counter() - started)
+        if rate > best_rate:
+            best_size, best_rate = batch_size, rate
+    return best_size
+
+def _encode_shard(texts: List[str]) -> np.ndarray:
+    global _worker_batch_size
+    if _worker_batch_size is None:
+        _worker_batch_size = tune_batch_size(_worker_model, texts)
+    return np.asarray(
+        _worker_model.encode(texts, batch_size=_worker_batch_size, show_progress_bar=False),
+        dtype=np.float32
+    )
+
+class ParallelEmbedder:
+    """Encode les descriptions de produits dans un pool de processus.
+
+    Chaque processus charge son propre modèle et dispose de
+    `os.cpu_count() // n_workers` threads, pour ne pas surcharger les cœurs.
+    Les textes sont découpés en tranches contiguës et les embeddings sont
+    réassemblés dans l'ordre d'entrée. Sans `batch_size`, chaque processus
+    règle sa taille de lot sur sa première tranche.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, n_workers: Optional[int] = None,
+                 batch_size: Optional[int] = None):
+        cpu_count = os.cpu_count() or 1
+        self.model_name = model_name
+        self.n_workers = max(1, n_workers or cpu_count)
+        self.batch_size = batch_size
+        threads = max(1, cpu_count // self.n_workers)
+        if EMBEDDING_RUNTIME != 'torch':
+            # Exporter le modèle quantifié avant que les processus ne le chargent
+            export_quantized_model(model_name)
+        # 'spawn' : les processus ne doivent pas hériter de l'état de torch du parent
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(model_name, threads, batch_size)
+        )
+
+    def encode(self, texts: Sequence[str], **kwargs) -> np.ndarray:
+        """Encode `texts` (mêmes arguments que `SentenceTransformer.encode`, ignorés)."""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        shard_size = math.ceil(len(texts) / self.n_workers)
+        shards = [texts[start:start + shard_size] for start in range(0, len(texts), shard_size)]
+        return np.concatenate(list(self._executor.map(_encode_shard, shards)))
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,90 +1,372 @@
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
+import hashlib
+import os
+import threading
 import pandas as pd
-from typing import List, Optional
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Set
+from .cache import TTLCache
+from .config import (CATALOG_CHUNK_SIZE, HYBRID_CANDIDATES, HYBRID_SEARCH,
+                     NUMPY_INDEX_DTYPE, QUERY_CACHE_SIZE, QUERY_CACHE_TTL, RERANK_CANDIDATES,
+                     RERANK_ENABLED, RRF_K, SEARCH_RESULTS, VECTOR_BACKEND)
+from .embeddings import embedding_model_key, load_embedding_model
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .reranker import CrossEncoderReranker
+from .vector_store import VectorStore, create_vector_store, matches_filters
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Version du schéma des métadonnées : l'incrémenter force la ré-indexation
+INDEX_SCHEMA_VERSION = 3
+
+# Colonnes du catalogue lues à l'indexation ('product_id' si le catalogue en fournit)
+CATALOG_COLUMNS = ['product_id', 'name', 'gift_category', 'main_category', 'sub_category',
+                   'discount_price', 'ratings', 'rich_description']
 
 class RAGEngine:
-    def __init__(self):
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.chroma_client = chromadb.Client(Settings(
-            persist_directory="./data/chroma_db"
+    def __init__(self, backend: str = VECTOR_BACKEND, persist_directory: Optional[str] = None,
+                 store: Optional[VectorStore] = None, hybrid_search: bool = HYBRID_SEARCH,
+                 reranker: Optional[CrossEncoderReranker] = None, embedder=None):
+        self._embedding_model = None
+        # Encodeur du catalogue à l'indexation (ex. ParallelEmbedder), sinon le modèle de requêtes
+        self.embedder = embedder
+        self.store = store if store is not None else create_vector_store(backend, persist_directory, dtype=NUMPY_INDEX_DTYPE)
+        # Recherche lexicale BM25 fusionnée avec la recherche vectorielle
+        self.hybrid_search = hybrid_search
+        # L'index BM25 est écrit à côté de l'index vectoriel pour ne pas être reconstruit à chaque démarrage
+        directory = getattr(self.store, 'persist_directory', None)
+        self.lexical_path = os.path.join(directory, 'bm25.json') if directory else None
+        self.lexical_index = self._load_lexical_index() if hybrid_search else BM25Index()
+        self._lexical_lock = threading.Lock()
+        # Re-classement d'un plus grand nombre de candidats par un cross-encoder
+        self.reranker = reranker or (CrossEncoderReranker() if RERANK_ENABLED else None)
+        # Caches des embeddings de requêtes et des résultats de recherche
+        self._embedding_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+        self._results_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+        self._index_version = 0
+        # Le moteur est partagé entre les sessions Streamlit d'un même processus
+        self._lock = threading.RLock()
+
+    def _load_lexical_index(self) -> BM25Index:
+        """Recharge l'index BM25 persisté, ou renvoie un index vide."""
+        if self.lexical_path:
+            try:
+                index = BM25Index.load(self.lexical_path)
+                if index is not None:
+                    print(f"Index lexical rechargé : {len(index)} produits")
+                    return index
+            except Exception as e:
+                print(f"Erreur lors du chargement de l'index lexical : {e}")
+        return BM25Index()
+
+    @property
+    def embedding_model(self) -> 'SentenceTransformer':
+        """Charge le modèle d'embedding à la première utilisation."""
+        if self._embedding_model is None:
+            with self._lock:
+                if self._embedding_model is None:
+                    self._embedding_model = load_embedding_model()
+        return self._embedding_model
+
+    def warm_up(self):
+        """Charge les modèles et l'index avant la première requête utilisateur."""
+        self.find_similar_products("cadeau", n_results=1)
+
+    def cache_stats(self) -> dict:
+        """Compteurs des caches de requêtes (taille, succès, échecs, évictions)."""
+        stats = {
+            'embeddings': self._embedding_cache.stats(),
+            'results': self._results_cache.stats()
+        }
+        if self.reranker:
+            stats['reranker'] = self.reranker.stats()
+        return stats
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Forme canonique d'une requête : minuscules et espaces normalisés."""
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _filters_key(filters: dict) -> tuple:
+        """Clé hachable décrivant les contraintes d'une recherche."""
+        return tuple(sorted(
+            (name, tuple(sorted(value)) if isinstance(value, (list, tuple, set)) else value)
+            for name, value in filters.items()
+            if value is not None and value != []
         ))
-        self.collection = self._init_collection()
-        self.products_df = None
 
-    def _init_collection(self):
-        """Initialise ou récupère la collection ChromaDB."""
-        try:
-            return self.chroma_client.get_collection("products")
-        except:
-            return self.chroma_client.create_collection("products")
+    def embed_query(self, query: str):
+        """Encode une requête, en réutilisant l'embedding d'une requête identique."""
+        key = self._normalize_query(query)
+        embedding = self._embedding_cache.get(key)
+        if embedding is None:
+            with self._lock:
+                embedding = self.embedding_model.encode(key)
+            self._embedding_cache.set(key, embedding)
+        return embedding
 
-    def _create_search_description(self, row) -> str:
+    @staticmethod
+    def _create_search_description(row) -> str:
         """Crée une description enrichie pour la recherche."""
         return (f"{row['name']} - {row['gift_category']} - "
                 f"{row['main_category']} - {row['sub_category']} - "
                 f"Prix: {row['discount_price']}€ - "
                 f"Note: {row['ratings']}/5 - {row['rich_description']}")
 
+    @staticmethod
+    def _content_hash(description: str) -> str:
+        """Empreinte du texte indexé (et du modèle qui l'a encodé)."""
+        return hashlib.sha1(
+            f"{embedding_model_key()}\n{INDEX_SCHEMA_VERSION}\n{description}".encode('utf-8')
+        ).hexdigest()
+
+    @staticmethod
+    def _product_metadata(row, content_hash: str) -> dict:
+        """Métadonnées stockées avec chaque produit : champs filtrables et champs affichés."""
+        return {
+            'content_hash': content_hash,
+            'name': str(row['name']),
+            'gift_category': str(row['gift_category']),
+            'rich_description': str(row['rich_description']),
+            'discount_price': float(row['discount_price']) if pd.notna(row['discount_price']) else 0.0,
+            'ratings': float(row['ratings']) if pd.notna(row['ratings']) else 0.0,
+            'main_category': str(row['main_category']),
+            'sub_category': str(row['sub_category'])
+        }
+
+    @staticmethod
+    def _product_ids(df: pd.DataFrame, seen: Optional[Set[str]] = None) -> List[str]:
+        """Identifiants stables des produits, indépendants de leur position dans le catalogue.
+
+        `seen` contient les identifiants déjà attribués (morceaux précédents du
+        catalogue); il est complété avec ceux de `df`.
+        """
+        seen = set() if seen is None else seen
+        if 'product_id' in df.columns:
+            product_ids = df['product_id'].astype(str).tolist()
+            seen.update(product_ids)
+            return product_ids
+
+        keys = (df['name'].astype(str) + '|' + df['main_category'].astype(str)
+                + '|' + df['sub_category'].astype(str))
+        # Les doublons exacts sont départagés par leur rang d'apparition
+        product_ids = []
+        for key in keys:
+            base = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+            product_id, n = base, 0
+            while product_id in seen:
+                n += 1
+                product_id = f"{base}-{n}"
+            seen.add(product_id)
+            product_ids.append(product_id)
+        return product_ids
+
+    @staticmethod
+    def _to_product(product_id: str, metadata: dict) -> dict:
+        """Produit renvoyé à l'appelant, construit à partir des métadonnées de l'index."""
+        return {
+            'id': product_id,
+            'name': metadata['name'],
+            'price': metadata['discount_price'],
+            'rating': metadata['ratings'],
+            'category': metadata['gift_category'],
+            'description': metadata['rich_description']
+        }
+
     def index_products(self, df: pd.DataFrame):
-        """Indexe les produits dans la base vectorielle."""
+        """Indexe les produits dans la base vectorielle.
+
+        Seuls les produits nouveaux ou dont la description a changé depuis
+        la dernière indexation sont ré-encodés.
+        """
         try:
-            print("Début de l'indexation des produits...")
-            self.products_df = df
-            
-            # Créer les descriptions de recherche
-            search_descriptions = df.apply(self._create_search_description, axis=1).tolist()
-            
-            # Créer les embeddings
-            embeddings = self.embedding_model.encode(
-                search_descriptions,
-                batch_size=32,
-                show_progress_bar=True
-            )
-            
-            # Ajouter à ChromaDB
-            self.collection.add(
-                embeddings=embeddings.tolist(),
-                documents=search_descriptions,
-                ids=[str(i) for i in range(len(df))]
-            )
-            
-            print(f"Indexation terminée : {len(df)} produits indexés")
-            return True
-            
+            with self._lock:
+                chunks = (df.iloc[start:start + CATALOG_CHUNK_SIZE]
+                          for start in range(0, len(df), CATALOG_CHUNK_SIZE))
+                return self._index_chunks(chunks)
         except Exception as e:
             print(f"Erreur lors de l'indexation : {e}")
             return False
 
-    def find_similar_products(self, query: str, n_results: int = 4) -> List[dict]:
-        """Trouve les produits similaires basés sur la requête."""
+    def index_catalog(self, chunks: Iterable[pd.DataFrame],
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Indexe un catalogue lu par morceaux (voir `DataLoader.iter_catalog_chunks`).
+
+        Chaque morceau est encodé et écrit dans l'index avant la lecture du
+        suivant : les lignes du catalogue et les embeddings en cours de calcul
+        restent de la taille d'un morceau. Les identifiants, les empreintes de
+        l'index et l'index BM25 restent en revanche proportionnels au
+        catalogue. `progress_callback(produits_lus, produits_encodés)` est
+        appelé après chaque morceau.
+        """
         try:
-            # Créer l'embedding de la requête
-            query_embedding = self.embedding_model.encode(query)
-            
-            # Rechercher les produits similaires
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=n_results
+            with self._lock:
+                return self._index_chunks(chunks, progress_callback)
+        except Exception as e:
+            print(f"Erreur lors de l'indexation : {e}")
+            return False
+
+    def _index_chunks(self, chunks: Iterable[pd.DataFrame],
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        print("Début de l'indexation des produits...")
+
+        # Empreintes de l'index persistant, pour ne ré-encoder que les produits modifiés
+        indexed = self.store.content_hashes()
+        seen: Set[str] = set()
+        n_products = n_embedded = 0
+
+        for chunk in chunks:
+            n_embedded += self._index_chunk(chunk, indexed, seen)
+            n_products += len(chunk)
+            print(f"  {n_products} produits lus, {n_embedded} encodés")
+            if progress_callback:
+                progress_callback(n_products, n_embedded)
+
+        # Supprimer les produits qui ne sont plus dans le catalogue
+        stale_ids = list(indexed.keys() - seen)
+        if stale_ids:
+            self.store.delete(stale_ids)
+        if self.hybrid_search:
+            with self._lexical_lock:
+                for product_id in set(self.lexical_index.doc_ids()) - seen:
+                    self.lexical_index.remove(product_id)
+                if self.lexical_index.dirty and self.lexical_path:
+                    self.lexical_index.save(self.lexical_path)
+
+        if n_embedded or stale_ids:
+            self.store.persist()
+            # Les résultats en cache ne reflètent plus l'index
+            self._index_version += 1
+            self._results_cache.clear()
+
+        print(f"Indexation terminée : {n_products} produits indexés "
+              f"({n_embedded} encodés, {len(stale_ids)} supprimés)")
+        return True
+
+    def _index_chunk(self, df: pd.DataFrame, indexed: dict, seen: Set[str]) -> int:
+        """Encode et écrit dans l'index les produits nouveaux ou modifiés d'un morceau."""
+        # Créer les descriptions de recherche et leurs empreintes
+        product_ids = self._product_ids(df, seen)
+        records = df.to_dict('records')
+        search_descriptions = [self._create_search_description(row) for row in records]
+        content_hashes = [self._content_hash(desc) for desc in search_descriptions]
+
+        # Comparer avec l'index persistant
+        to_embed = [
+            i for i, (product_id, content_hash) in enumerate(zip(product_ids, content_hashes))
+            if indexed.get(product_id) != content_hash
+        ]
+
+        if to_embed:
+            # Créer les embeddings des seuls produits modifiés
+            embeddings = (self.embedder or self.embedding_model).encode(
+                [search_descriptions[i] for i in to_embed],
+                batch_size=32,
+                show_progress_bar=False
+            )
+
+            self.store.add(
+                ids=[product_ids[i] for i in to_embed],
+                embeddings=embeddings,
+                documents=[search_descriptions[i] for i in to_embed],
+                metadatas=[self._product_metadata(records[i], content_hashes[i]) for i in to_embed]
             )
-            
-            # Récupérer les indices des produits trouvés
-            found_products = []
-            for i, doc in enumerate(results['documents'][0]):
-                if self.products_df is not None:
-                    product_idx = int(results['ids'][0][i])
-                    product = self.products_df.iloc[product_idx]
-                    found_products.append({
-                        'name': product['name'],
-                        'price': product['discount_price'],
-                        'rating': product['ratings'],
-                        'category': product['gift_category'],
-                        'description': product['rich_description']
-                    })
-            
-            return found_products
-            
+
+        if self.hybrid_search:
+            self._update_lexical_index(df, product_ids)
+
+        return len(to_embed)
+
+    def _update_lexical_index(self, df: pd.DataFrame, product_ids: List[str]):
+        """Met à jour l'index BM25 (seuls les textes modifiés sont ré-indexés)."""
+        lexical_texts = (df['name'].astype(str) + ' ' + df['sub_category'].astype(str)
+                         + ' ' + df['rich_description'].astype(str)).tolist()
+        with self._lexical_lock:
+            for product_id, text in zip(product_ids, lexical_texts):
+                self.lexical_index.add(product_id, text)
+
+    def _fuse_lexical(self, query: str, vector_hits: list, filters: dict,
+                      n_results: int) -> List[tuple]:
+        """Fusionne les résultats vectoriels et BM25 par Reciprocal Rank Fusion."""
+        if not vector_hits:
+            # Aucun produit ne respecte les contraintes : rien à fusionner
+            return []
+        metadata_by_id = {product_id: metadata for product_id, _, metadata in vector_hits}
+
+        with self._lexical_lock:
+            lexical_hits = self.lexical_index.search(query, k=5 * len(vector_hits))
+        lexical_ids = [product_id for product_id, _ in lexical_hits]
+        metadata_by_id.update(self.store.get(
+            [product_id for product_id in lexical_ids if product_id not in metadata_by_id]
+        ))
+        lexical_ids = [
+            product_id for product_id in lexical_ids
+            if product_id in metadata_by_id and matches_filters(metadata_by_id[product_id], filters)
+        ]
+
+        fused = reciprocal_rank_fusion(
+            [[product_id for product_id, _, _ in vector_hits], lexical_ids],
+            k=RRF_K, limit=n_results
+        )
+        return [(product_id, metadata_by_id[product_id]) for product_id in fused]
+
+    def _rerank(self, query: str, ranked: List[tuple], n_results: int) -> List[tuple]:
+        """Re-classe les candidats avec le cross-encoder, dans la limite de son budget."""
+        documents = [
+            f"{metadata['name']} - {metadata['sub_category']} - {metadata['rich_description']}"
+            for _, metadata in ranked
+        ]
+        order = self.reranker.rerank(query, documents, n_results)
+        if order is None:
+            return ranked[:n_results]
+        return [ranked[i] for i in order]
+
+    def find_similar_products(self, query: str, n_results: int = SEARCH_RESULTS,
+                              price_min: Optional[float] = None,
+                              price_max: Optional[float] = None,
+                              main_categories: Optional[Iterable[str]] = None,
+                              sub_categories: Optional[Iterable[str]] = None,
+                              min_rating: Optional[float] = None) -> List[dict]:
+        """Trouve les produits similaires basés sur la requête.
+
+        Les contraintes (prix sur `discount_price`, catégories, note minimale)
+        sont appliquées par l'index pendant la recherche. Si un re-classement est
+        configuré, `RERANK_CANDIDATES` candidats sont récupérés puis re-classés.
+        """
+        try:
+            filters = {
+                'price_min': price_min,
+                'price_max': price_max,
+                'main_categories': list(main_categories or []),
+                'sub_categories': list(sub_categories or []),
+                'min_rating': min_rating
+            }
+            cache_key = (self._index_version, self._normalize_query(query), n_results,
+                         self._filters_key(filters))
+            cached = self._results_cache.get(cache_key)
+            if cached is not None:
+                return [dict(product) for product in cached]
+
+            # Créer l'embedding de la requête
+            query_embedding = self.embed_query(query)
+
+            # Rechercher les produits similaires parmi ceux qui respectent les contraintes
+            n_candidates = max(n_results, RERANK_CANDIDATES) if self.reranker else n_results
+            if self.hybrid_search and len(self.lexical_index):
+                pool = max(n_candidates, HYBRID_CANDIDATES)
+                hits = self.store.query(query_embedding[None, :], pool, filters)[0]
+                ranked = self._fuse_lexical(query, hits, filters, n_candidates)
+            else:
+                hits = self.store.query(query_embedding[None, :], n_candidates, filters)[0]
+                ranked = [(product_id, metadata) for product_id, _, metadata in hits]
+
+            if self.reranker and len(ranked) > n_results:
+                ranked = self._rerank(query, ranked, n_results)
+            products = [self._to_product(product_id, metadata) for product_id, metadata in ranked]
+
+            self._results_cache.set(cache_key, products)
+            return [dict(product) for product in products]
+
         except Exception as e:
             print(f"Erreur lors de la recherche : {e}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional
+from .config import RERANK_BUDGET_MS, RERANK_MODEL_NAME
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+class CrossEncoderReranker:
+    """Re-classement des candidats de la recherche par un cross-encoder (CPU).
+
+    Toutes les paires (requête, produit) sont scorées en un seul lot. Le coût
+    par paire est mesuré à chaque appel (moyenne glissante) : si le lot complet
+    dépasserait `budget_ms`, seuls les premiers candidats du premier étage sont
+    re-classés, et le re-classement est sauté s'il ne reste pas assez de place
+    pour les `top_k` demandés.
+    """
+
+    # Poids de la dernière mesure dans la moyenne glissante du coût par paire
+    COST_SMOOTHING = 0.3
+    # Facteur appliqué au coût estimé à chaque re-classement sauté : sans cette
+    # décroissance le coût ne serait plus jamais mesuré et le re-classement
+    # resterait désactivé après un pic de charge
+    SKIP_DECAY = 0.9
+
+    def __init__(self, model_name: str = RERANK_MODEL_NAME, budget_ms: float = RERANK_BUDGET_MS,
+                 batch_size: int = 64):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self._model = None
+        self._ms_per_pair: Optional[float] = None
+        self.skipped = 0
+        self.truncated = 0
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> 'CrossEncoder':
+        """Charge le cross-encoder à la première utilisation."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name, device='cpu')
+        return self._model
+
+    def max_pairs(self) -> Optional[int]:
+        """Nombre de paires scorables dans le budget, ou None tant que le coût est inconnu."""
+        if self._ms_per_pair is None or self.budget_ms <= 0:
+            return None
+        return int(self.budget_ms / self._ms_per_pair)
+
+    def rerank(self, query: str, documents: List[str], top_k: int) -> Optional[List[int]]:
+        """Renvoie les indices des `top_k` meilleurs documents, ou None si le budget ne le permet pas.
+
+        `documents` est supposé trié par le premier étage de recherche.
+        """
+        limit = self.max_pairs()
+        if limit is not None and limit < min(top_k, len(documents)):
+            self.skipped += 1
+            self._ms_per_pair *= self.SKIP_DECAY
+            return None
+        if limit is not None and limit < len(documents):
+            self.truncated += 1
+            documents = documents[:limit]
+
+        model = self.model
+        with self._lock:
+            # Mesuré sous le verrou : l'attente des autres requêtes n'est pas un coût du modèle
+            started = time.perf_counter()
+            scores = model.predict([(query, document) for document in documents],
+                                   batch_size=self.batch_size, show_progress_bar=False)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        self._update_cost(elapsed_ms / len(documents))
+
+        ranked = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return ranked[:top_k]
+
+    def _update_cost(self, ms_per_pair: float):
+        if self._ms_per_pair is None:
+            self._ms_per_pair = ms_per_pair
+        else:
+            self._ms_per_pair += self.COST_SMOOTHING * (ms_per_pair - self._ms_per_pair)
+
+    def stats(self) -> dict:
+        """Coût estimé par paire et nombre de re-classements tronqués ou sautés."""
+        return {
+            'ms_per_pair': self._ms_per_pair,
+            'max_pairs': self.max_pairs(),
+            'truncated': self.truncated,
+            'skipped': self.skipped
+        }
@@ -1,55 +1,207 @@
 import os
 import csv
+import sqlite3
+import threading
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from .config import (
+    RECOMMENDATIONS_CSV_PATH, STORAGE_DB_PATH, STORAGE_FLUSH_INTERVAL, STORAGE_FLUSH_SIZE, STORAGE_QUEUE_SIZE
+)
+from .write_behind import WriteBehindQueue
+
+# Columns of the recommendations table, in the order of the legacy CSV file
+RECOMMENDATION_FIELDS = [
+    'timestamp', 'user_id', 'description',
+    'price_range', 'gift_type', 'interests', 'context'
+]
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+INSERT_RECOMMENDATION = (
+    f"INSERT INTO recommendations ({', '.join(RECOMMENDATION_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(RECOMMENDATION_FIELDS))})"
+)
 
 class DataStorage:
-    def __init__(self):
+    def __init__(self, db_path: str = STORAGE_DB_PATH, csv_path: Optional[str] = RECOMMENDATIONS_CSV_PATH):
         """
-        Initialize the DataStorage class with local CSV storage
+        Initialize the DataStorage class with local SQLite storage.
+
+        The database runs in WAL mode so that several Streamlit processes can
+        write to it while others read. Rows from the legacy CSV file at
+        `csv_path` are imported once, on first use.
         """
-        self.recommendations_path = 'data/recommendations.csv'
+        self.db_path = db_path
+        self.recommendations_path = csv_path
+        self._lock = threading.Lock()
         self._initialize_storage()
 
     def _initialize_storage(self):
-        """Initialize the storage system and create necessary directories/files."""
-        os.makedirs('data', exist_ok=True)
-        
-        if not os.path.exists(self.recommendations_path):
-            with open(self.recommendations_path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 'user_id', 'description', 
-                    'price_range', 'gift_type', 'interests', 'context'
-                ])
+        """Initialize the storage system and create necessary directories/tables."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS recommendations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                user_id TEXT NOT NULL DEFAULT '',
+                description TEXT NOT NULL DEFAULT '',
+                price_range TEXT NOT NULL DEFAULT '',
+                gift_type TEXT NOT NULL DEFAULT '',
+                interests TEXT NOT NULL DEFAULT '',
+                context TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # One user's history, newest first, without scanning the table
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recommendations_user_timestamp "
+            "ON recommendations(user_id, timestamp)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recommendations_timestamp ON recommendations(timestamp)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY, applied_at TEXT NOT NULL)")
+        self._conn.commit()
+
+        if self.recommendations_path and os.path.exists(self.recommendations_path):
+            self.migrate_csv(self.recommendations_path)
+
+    @staticmethod
+    def _row(info: Dict, timestamp: Optional[str] = None) -> tuple:
+        return (timestamp or datetime.now().strftime(TIMESTAMP_FORMAT),) + tuple(
+            str(info.get(field) or '') for field in RECOMMENDATION_FIELDS[1:]
+        )
+
+    def migrate_csv(self, csv_path: str) -> int:
+        """Import the rows of a legacy recommendations CSV once; returns the number imported."""
+        name = f"csv:{os.path.abspath(csv_path)}"
+        try:
+            with self._lock:
+                # BEGIN IMMEDIATE: only one process imports the file
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                        self._conn.rollback()
+                        return 0
+                    with open(csv_path, 'r', newline='') as f:
+                        rows = [self._row(row, row.get('timestamp')) for row in csv.DictReader(f)]
+                    self._conn.executemany(INSERT_RECOMMENDATION, rows)
+                    self._conn.execute(
+                        "INSERT INTO migrations (name, applied_at) VALUES (?, ?)",
+                        (name, datetime.now().strftime(TIMESTAMP_FORMAT))
+                    )
+                    self._conn.commit()
+                except BaseException:
+                    self._conn.rollback()
+                    raise
+            if rows:
+                print(f"Migrated {len(rows)} recommendations from {csv_path} to {self.db_path}")
+            return len(rows)
+        except Exception as e:
+            print(f"Error migrating recommendations from {csv_path}: {e}")
+            return 0
 
     def save_recommendation(self, info):
-        """Save recommendation information to CSV."""
+        """Save recommendation information."""
+        return self.save_recommendations([info])
+
+    def save_recommendations(self, infos: Iterable[Dict]):
+        """Save several recommendations in a single transaction."""
         try:
-            with open(self.recommendations_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    info.get('user_id', ''),
-                    info.get('description', ''),
-                    info.get('price_range', ''),
-                    info.get('gift_type', ''),
-                    info.get('interests', ''),
-                    info.get('context', '')
-                ])
+            rows = [self._row(info) for info in infos]
+            if rows:
+                with self._lock:
+                    with self._conn:
+                        self._conn.executemany(INSERT_RECOMMENDATION, rows)
             return True
         except Exception as e:
             print(f"Error saving recommendation: {e}")
             return False
 
-    def get_recommendations(self):
-        """Retrieve all recommendations from CSV."""
+    def get_recommendations(self, user_id: Optional[str] = None, since: Optional[str] = None,
+                            until: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+                            newest_first: bool = False) -> List[Dict[str, str]]:
+        """Retrieve recommendations, optionally for one user, a time range and a page.
+
+        `since` and `until` are timestamps in the stored format ("%Y-%m-%d %H:%M:%S"),
+        both inclusive. Without arguments, returns every recommendation, oldest first.
+        """
         try:
-            recommendations = []
-            with open(self.recommendations_path, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    recommendations.append(row)
-            return recommendations
+            conditions, params = self._conditions(user_id, since, until)
+            query = f"SELECT {', '.join(RECOMMENDATION_FIELDS)} FROM recommendations{conditions}"
+            order = 'DESC' if newest_first else 'ASC'
+            query += f" ORDER BY timestamp {order}, id {order}"
+            if limit is not None or offset:
+                query += " LIMIT ? OFFSET ?"
+                params += [-1 if limit is None else limit, offset]
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            return [dict(zip(RECOMMENDATION_FIELDS, row)) for row in rows]
         except Exception as e:
             print(f"Error retrieving recommendations: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def count_recommendations(self, user_id: Optional[str] = None, since: Optional[str] = None,
+                              until: Optional[str] = None) -> int:
+        """Number of recommendations matching the same filters as `get_recommendations`."""
+        try:
+            conditions, params = self._conditions(user_id, since, until)
+            with self._lock:
+                return self._conn.execute(f"SELECT COUNT(*) FROM recommendations{conditions}", params).fetchone()[0]
+        except Exception as e:
+            print(f"Error counting recommendations: {e}")
+            return 0
+
+    @staticmethod
+    def _conditions(user_id: Optional[str], since: Optional[str], until: Optional[str]):
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+class BufferedDataStorage(DataStorage):
+    """DataStorage whose `save_recommendation` returns without touching the disk.
+
+    Rows are timestamped when saved and written in batches by a background
+    thread (see WriteBehindQueue); reads see them once their batch is flushed.
+    """
+
+    def __init__(self, db_path: str = STORAGE_DB_PATH, csv_path: Optional[str] = RECOMMENDATIONS_CSV_PATH,
+                 batch_size: int = STORAGE_FLUSH_SIZE, flush_interval: float = STORAGE_FLUSH_INTERVAL,
+                 max_pending: int = STORAGE_QUEUE_SIZE):
+        super().__init__(db_path, csv_path)
+        self.write_queue = WriteBehindQueue(
+            self._write_rows, batch_size=batch_size, flush_interval=flush_interval,
+            max_pending=max_pending, name="storage-writer"
+        )
+
+    def save_recommendation(self, info):
+        """Queue recommendation information for the next batch."""
+        return self.write_queue.submit(self._row(info))
+
+    def _write_rows(self, rows: List[tuple]):
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(INSERT_RECOMMENDATION, rows)
+
+    def close(self):
+        """Flush the pending rows, then close the database connection."""
+        self.write_queue.close()
+        super().close()
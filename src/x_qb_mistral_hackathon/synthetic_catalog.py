@@ -0,0 +1,227 @@
+"""Génération reproductible de catalogues synthétiques de cadeaux.
+
+Les produits sont générés par blocs vectorisés (NumPy) et écrits au fur et à
+mesure, au format attendu par `DataLoader` : CSV séparé par `;` (encodage
+latin1, comme data_gifts.csv) ou Parquet. Le contenu ne dépend que de la
+graine et du nombre de lignes, ce qui permet de tester l'indexation et la
+recherche jusqu'à plusieurs millions de produits.
+"""
+import os
+import time
+from typing import Iterator, Optional
+import numpy as np
+import pandas as pd
+
+# Produits générés par bloc; chaque bloc a sa propre graine dérivée de la graine du catalogue
+BLOCK_SIZE = 100_000
+
+CATEGORIES = {
+    'Electronics': {
+        'sub_categories': ['Smartphones', 'Tablettes', 'Liseuses', 'Écouteurs', 'Enceintes', 'Montres connectées', 'Appareils photo', 'Consoles de jeux'],
+        'gift_category': 'Tech',
+        'prix_min': 30,
+        'prix_max': 800
+    },
+    'Books': {
+        'sub_categories': ['Romans', 'Cuisine', 'Développement personnel', 'Sciences', 'Art', 'Voyages', 'BD & Mangas', 'Histoire'],
+        'gift_category': 'Culture',
+        'prix_min': 10,
+        'prix_max': 50
+    },
+    'Home & Kitchen': {
+        'sub_categories': ['Petit électroménager', 'Arts de la table', 'Décoration', 'Accessoires cuisine', 'Machine à café', 'Ustensiles'],
+        'gift_category': 'Maison',
+        'prix_min': 20,
+        'prix_max': 400
+    },
+    'Beauty & Health': {
+        'sub_categories': ['Soins visage', 'Parfums', 'Bien-être', 'Massage', 'Spa', 'Cosmétiques', 'Soins cheveux'],
+        'gift_category': 'Bien-être',
+        'prix_min': 15,
+        'prix_max': 200
+    },
+    'Sports & Fitness': {
+        'sub_categories': ['Yoga', 'Fitness', 'Running', 'Sports d\'équipe', 'Randonnée', 'Natation', 'Cyclisme'],
+        'gift_category': 'Sport',
+        'prix_min': 20,
+        'prix_max': 300
+    },
+    'Toys & Games': {
+        'sub_categories': ['Jeux de société', 'Puzzles', 'Jeux créatifs', 'Jeux éducatifs', 'Jeux de construction', 'Jeux d\'extérieur'],
+        'gift_category': 'Loisirs',
+        'prix_min': 15,
+        'prix_max': 150
+    },
+    'Jewelry': {
+        'sub_categories': ['Colliers', 'Bagues', 'Bracelets', 'Boucles d\'oreilles', 'Montres', 'Bijoux personnalisés'],
+        'gift_category': 'Mode',
+        'prix_min': 20,
+        'prix_max': 500
+    },
+    'Art & Crafts': {
+        'sub_categories': ['Peinture', 'Dessin', 'Scrapbooking', 'Poterie', 'Couture', 'Tricot'],
+        'gift_category': 'Créatif',
+        'prix_min': 15,
+        'prix_max': 200
+    },
+    'Gourmet Food': {
+        'sub_categories': ['Chocolats', 'Thés', 'Cafés', 'Vins', 'Épicerie fine', 'Box découverte'],
+        'gift_category': 'Gastronomie',
+        'prix_min': 20,
+        'prix_max': 150
+    },
+    'Garden': {
+        'sub_categories': ['Outils', 'Plantes', 'Décoration extérieure', 'Jardinage urbain', 'Accessoires'],
+        'gift_category': 'Nature',
+        'prix_min': 15,
+        'prix_max': 250
+    },
+    'Musical Instruments': {
+        'sub_categories': ['Guitares', 'Pianos', 'Percussion', 'Accessoires', 'Débutant', 'Instruments traditionnels'],
+        'gift_category': 'Musique',
+        'prix_min': 30,
+        'prix_max': 600
+    },
+    'Experience Gifts': {
+        'sub_categories': ['Spa & Bien-être', 'Gastronomie', 'Sport & Aventure', 'Culture', 'Séjours', 'Ateliers'],
+        'gift_category': 'Expérience',
+        'prix_min': 50,
+        'prix_max': 500
+    }
+}
+
+BRANDS = {
+    'Electronics': ['Samsung', 'Sony', 'Apple', 'Philips', 'Bose', 'JBL'],
+    'Books': ['Larousse', 'Marabout', 'Hachette', 'Gallimard', 'Flammarion'],
+    'Home & Kitchen': ['Moulinex', 'Tefal', 'KitchenAid', 'Bosch', 'Siemens'],
+    'Beauty & Health': ['L\'Oréal', 'Yves Rocher', 'Nivea', 'Clarins', 'Lancôme'],
+    'Sports & Fitness': ['Nike', 'Adidas', 'Puma', 'Decathlon', 'Under Armour'],
+    'Toys & Games': ['Ravensburger', 'Lego', 'Playmobil', 'Mattel', 'Hasbro'],
+    'Jewelry': ['Swarovski', 'Pandora', 'Thomas Sabo', 'Fossil', 'Michael Kors'],
+    'Art & Crafts': ['Faber-Castell', 'Staedtler', 'Moleskine', 'Leuchtturm1917'],
+    'Gourmet Food': ['Valrhona', 'Kusmi Tea', 'Nespresso', 'Mariage Frères'],
+    'Garden': ['Gardena', 'Weber', 'Fiskars', 'Hozelock', 'Bosch'],
+    'Musical Instruments': ['Yamaha', 'Roland', 'Fender', 'Gibson', 'Casio'],
+    'Experience Gifts': ['Wonderbox', 'Smartbox', 'Buyagift', 'Virgin Experience']
+}
+
+# Descriptions par catégorie : texte avant la note, entre la note et le nombre d'avis, après
+DESCRIPTIONS = {
+    'Electronics': ("Produit tech innovant avec les dernières fonctionnalités. Design élégant et performances optimales. ", "/5 étoiles basé sur ", " avis."),
+    'Books': ("Un ouvrage captivant qui vous transportera dans un nouvel univers. ", "/5 étoiles selon ", " lecteurs."),
+    'Home & Kitchen': ("Accessoire de cuisine indispensable alliant praticité et style. Note de ", "/5 par ", " utilisateurs satisfaits."),
+    'Beauty & Health': ("Produit de beauté haute qualité pour des résultats professionnels. ", "/5 étoiles selon ", " clients."),
+    'Sports & Fitness': ("Équipement sportif performant pour atteindre vos objectifs. ", "/5 basé sur ", " sportifs."),
+    'Toys & Games': ("Jeu divertissant pour des heures de plaisir. Note moyenne de ", "/5 par ", " joueurs."),
+    'Jewelry': ("Bijou élégant fait avec des matériaux de qualité. ", "/5 étoiles selon ", " acheteurs."),
+    'Art & Crafts': ("Matériel créatif de qualité professionnelle. ", "/5 basé sur ", " artistes."),
+    'Gourmet Food': ("Produit gastronomique sélectionné pour sa qualité exceptionnelle. Note de ", "/5 par ", " gourmets."),
+    'Garden': ("Outil de jardinage robuste et ergonomique. ", "/5 étoiles selon ", " jardiniers."),
+    'Musical Instruments': ("Instrument de qualité avec un son exceptionnel. ", "/5 basé sur ", " musiciens."),
+    'Experience Gifts': ("Expérience unique et mémorable. Note de ", "/5 par ", " participants.")
+}
+
+# Tables indexées par sous-catégorie, construites une seule fois
+_MAIN_CATEGORIES = list(CATEGORIES)
+_SUB_MAIN = np.array([i for i, info in enumerate(CATEGORIES.values()) for _ in info['sub_categories']])
+_SUB_NAMES = np.array([sub for info in CATEGORIES.values() for sub in info['sub_categories']], dtype=object)
+_PRIX_MIN = np.array([info['prix_min'] for info in CATEGORIES.values()], dtype=float)
+_PRIX_MAX = np.array([info['prix_max'] for info in CATEGORIES.values()], dtype=float)
+_N_BRANDS = np.array([len(BRANDS[main]) for main in _MAIN_CATEGORIES])
+_BRAND_TABLE = np.array([
+    BRANDS[main] + [''] * (_N_BRANDS.max() - len(BRANDS[main])) for main in _MAIN_CATEGORIES
+], dtype=object)
+
+def generate_block(seed: int, block_index: int, n_rows: int) -> pd.DataFrame:
+    """Génère un bloc de produits, déterminé par la graine et le numéro du bloc."""
+    rng = np.random.default_rng([seed, block_index])
+    sub_index = rng.integers(len(_SUB_NAMES), size=n_rows)
+    main_index = _SUB_MAIN[sub_index]
+
+    actual_price = np.round(rng.uniform(_PRIX_MIN[main_index], _PRIX_MAX[main_index]), 2)
+    discount = rng.uniform(0.1, 0.3, size=n_rows)
+    discount_price = np.round(actual_price * (1 - discount), 2)
+    rating = np.round(rng.uniform(3.8, 5, size=n_rows), 1)
+    num_ratings = rng.integers(50, 2000, size=n_rows)
+    brand_index = (rng.random(n_rows) * _N_BRANDS[main_index]).astype(int)
+
+    main = pd.Series(np.array(_MAIN_CATEGORIES, dtype=object)[main_index])
+    sub = pd.Series(_SUB_NAMES[sub_index])
+    # Le numéro de ligne rend chaque nom unique dans le catalogue
+    row_number = pd.Series(np.arange(block_index * BLOCK_SIZE, block_index * BLOCK_SIZE + n_rows)).astype(str)
+    name = pd.Series(_BRAND_TABLE[main_index, brand_index]) + ' ' + sub + ' ' + row_number
+
+    rating_text = pd.Series(rating).astype(str)
+    ratings_text = pd.Series(num_ratings).astype(str)
+    description = (main.map({k: v[0] for k, v in DESCRIPTIONS.items()}) + rating_text
+                   + main.map({k: v[1] for k, v in DESCRIPTIONS.items()}) + ratings_text
+                   + main.map({k: v[2] for k, v in DESCRIPTIONS.items()}))
+
+    return pd.DataFrame({
+        'name_of_the_product': name,
+        'main_category': main,
+        'sub_category': sub,
+        'ratings': rating,
+        'no_of_ratings': num_ratings,
+        'discounted_price': discount_price,
+        'actual_price': actual_price,
+        'gift_category': main.map({k: v['gift_category'] for k, v in CATEGORIES.items()}),
+        'rich_description': description
+    })
+
+def iter_catalog(n_rows: int, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """Produit le catalogue bloc par bloc (`BLOCK_SIZE` lignes au plus par bloc)."""
+    for block_index, start in enumerate(range(0, n_rows, BLOCK_SIZE)):
+        yield generate_block(seed, block_index, min(BLOCK_SIZE, n_rows - start))
+
+def write_catalog(path: str, n_rows: int, seed: int = 42, file_format: Optional[str] = None) -> int:
+    """Écrit un catalogue de `n_rows` produits dans `path` (CSV ou Parquet) et renvoie le nombre de lignes.
+
+    Le format est déduit de l'extension si `file_format` n'est pas précisé.
+    """
+    file_format = file_format or ('parquet' if path.endswith('.parquet') else 'csv')
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    if file_format == 'csv':
+        for i, block in enumerate(iter_catalog(n_rows, seed)):
+            block.to_csv(path, sep=';', index=False, header=(i == 0), mode='w' if i == 0 else 'a',
+                         encoding='latin1', errors='replace')
+            written += len(block)
+    elif file_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for block in iter_catalog(n_rows, seed):
+                table = pa.Table.from_pandas(block, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(block)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Format inconnu : {file_format} (attendu : csv ou parquet)")
+    return written
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Génère un catalogue synthétique de cadeaux.")
+    parser.add_argument('--rows', type=int, default=1000, help="nombre de produits")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='data/gift_dataset.csv', help="fichier .csv ou .parquet")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    written = write_catalog(args.output, args.rows, args.seed, args.format)
+    print(f"Dataset créé avec {written} produits dans {args.output} "
+          f"en {time.perf_counter() - started:.1f}s")
+    print(f"Pour l'utiliser : GIFTS_DATA_PATH={args.output}")
+    return 0
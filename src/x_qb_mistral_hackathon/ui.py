@@ -1,5 +1,4 @@
 import streamlit as st
-from x_qb_mistral_hackathon.data_loader import DataLoader
 
 class UI:
     @staticmethod
@@ -0,0 +1,393 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Un résultat de recherche : (identifiant produit, distance cosinus, métadonnées).
+# Tous les backends renvoient la même distance, 1 - similarité cosinus (entre 0 et 2).
+Hit = Tuple[str, float, dict]
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne (norme euclidienne 1), en float32."""
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+def matches_filters(metadata: dict, filters: Optional[dict]) -> bool:
+    """Indique si un produit respecte les contraintes de recherche."""
+    filters = filters or {}
+    price = metadata.get('discount_price', 0.0)
+    if filters.get('price_min') is not None and price < float(filters['price_min']):
+        return False
+    if filters.get('price_max') is not None and price > float(filters['price_max']):
+        return False
+    if filters.get('min_rating') is not None and metadata.get('ratings', 0.0) < float(filters['min_rating']):
+        return False
+    if filters.get('main_categories') and metadata.get('main_category') not in filters['main_categories']:
+        return False
+    if filters.get('sub_categories') and metadata.get('sub_category') not in filters['sub_categories']:
+        return False
+    return True
+
+class VectorStore(ABC):
+    """Interface commune des index vectoriels utilisés par RAGEngine.
+
+    Les contraintes de recherche sont un dictionnaire neutre pouvant contenir
+    `price_min`, `price_max`, `main_categories`, `sub_categories` et `min_rating`.
+    """
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], embeddings: np.ndarray,
+            documents: Sequence[str], metadatas: Sequence[dict]):
+        """Ajoute ou remplace des produits dans l'index."""
+
+    @abstractmethod
+    def query(self, embeddings: np.ndarray, n_results: int,
+              filters: Optional[dict] = None) -> List[List[Hit]]:
+        """Renvoie, pour chaque requête, les produits les plus proches (distance cosinus croissante)."""
+
+    @abstractmethod
+    def get(self, ids: Sequence[str]) -> Dict[str, dict]:
+        """Métadonnées des produits demandés, par identifiant."""
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]):
+        """Supprime des produits de l'index."""
+
+    @abstractmethod
+    def persist(self):
+        """Écrit l'index sur disque."""
+
+    @abstractmethod
+    def content_hashes(self) -> Dict[str, str]:
+        """Empreintes des produits indexés, par identifiant."""
+
+class ChromaVectorStore(VectorStore):
+    """Index ChromaDB persistant."""
+
+    # Taille maximale des lots envoyés à ChromaDB en une seule opération
+    BATCH_SIZE = 5000
+
+    def __init__(self, persist_directory: str):
+        import chromadb
+        self.persist_directory = persist_directory
+        self.chroma_client = chromadb.PersistentClient(path=persist_directory)
+        try:
+            self.collection = self.chroma_client.get_collection("products")
+        except Exception:
+            # Nouvelle collection : distance cosinus, comme NumpyVectorStore
+            self.collection = self.chroma_client.get_or_create_collection(
+                "products", metadata={"hnsw:space": "cosine"}
+            )
+        # Les collections créées avant le choix de la distance cosinus sont en L2
+        self.space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+
+    def _cosine_distances(self, distances: List[float]) -> List[float]:
+        """Convertit les distances de la collection en 1 - similarité cosinus.
+
+        Les embeddings étant normalisés, la distance L2 au carré renvoyée par
+        ChromaDB vaut 2 - 2 cos; les distances "cosine" et "ip" valent déjà 1 - cos.
+        """
+        if self.space == "l2":
+            return [d / 2 for d in distances]
+        return list(distances)
+
+    @staticmethod
+    def _build_where(filters: Optional[dict]) -> Optional[dict]:
+        """Traduit les contraintes de recherche en filtre ChromaDB."""
+        filters = filters or {}
+        conditions = []
+        if filters.get('price_min') is not None:
+            conditions.append({'discount_price': {'$gte': float(filters['price_min'])}})
+        if filters.get('price_max') is not None:
+            conditions.append({'discount_price': {'$lte': float(filters['price_max'])}})
+        if filters.get('main_categories'):
+            conditions.append({'main_category': {'$in': sorted(set(filters['main_categories']))}})
+        if filters.get('sub_categories'):
+            conditions.append({'sub_category': {'$in': sorted(set(filters['sub_categories']))}})
+        if filters.get('min_rating') is not None:
+            conditions.append({'ratings': {'$gte': float(filters['min_rating'])}})
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {'$and': conditions}
+
+    def add(self, ids, embeddings, documents, metadatas):
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            end = start + self.BATCH_SIZE
+            self.collection.upsert(
+                embeddings=normalize_rows(embeddings[start:end]).tolist(),
+                documents=list(documents[start:end]),
+                metadatas=list(metadatas[start:end]),
+                ids=list(ids[start:end])
+            )
+
+    def query(self, embeddings, n_results, filters=None):
+        results = self.collection.query(
+            query_embeddings=normalize_rows(embeddings).tolist(),
+            n_results=n_results,
+            where=self._build_where(filters)
+        )
+        return [
+            list(zip(ids, self._cosine_distances(distances), metadatas))
+            for ids, distances, metadatas in zip(
+                results['ids'], results['distances'], results['metadatas'])
+        ]
+
+    def get(self, ids):
+        if not ids:
+            return {}
+        page = self.collection.get(ids=list(ids), include=['metadatas'])
+        return dict(zip(page['ids'], page['metadatas']))
+
+    def delete(self, ids):
+        ids = list(ids)
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            self.collection.delete(ids=ids[start:start + self.BATCH_SIZE])
+
+    def persist(self):
+        # Le client persistant écrit chaque opération sur disque
+        pass
+
+    def content_hashes(self):
+        hashes = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=['metadatas'], limit=self.BATCH_SIZE, offset=offset)
+            if not page['ids']:
+                break
+            for product_id, metadata in zip(page['ids'], page['metadatas']):
+                hashes[product_id] = (metadata or {}).get('content_hash')
+            offset += len(page['ids'])
+        return hashes
+
+class NumpyVectorStore(VectorStore):
+    """Recherche exacte en mémoire sur une matrice NumPy contiguë d'embeddings normalisés.
+
+    Les champs filtrables sont gardés en colonnes NumPy à côté de la matrice,
+    de sorte qu'une recherche filtrée ne calcule les similarités que sur les
+    produits qui respectent les contraintes.
+    """
+
+    # Nombre de lignes converties en float32 à la fois lors du calcul des scores
+    BLOCK_SIZE = 65536
+
+    def __init__(self, persist_directory: str, dtype: str = 'float32'):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+        self.persist_directory = persist_directory
+        self.dtype = np.dtype(dtype)
+        self._size = 0
+        self._matrix = None
+        self._prices = np.empty(0, dtype=np.float32)
+        self._ratings = np.empty(0, dtype=np.float32)
+        self._main_codes = np.empty(0, dtype=np.int32)
+        self._sub_codes = np.empty(0, dtype=np.int32)
+        self._category_codes: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[dict] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def _embeddings_path(self) -> str:
+        return os.path.join(self.persist_directory, 'embeddings.npy')
+
+    @property
+    def _products_path(self) -> str:
+        return os.path.join(self.persist_directory, 'products.json')
+
+    def _load(self):
+        """Recharge l'index écrit par `persist`, s'il existe."""
+        if not (os.path.exists(self._embeddings_path) and os.path.exists(self._products_path)):
+            return
+        embeddings = np.load(self._embeddings_path)
+        with open(self._products_path, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        self.add(products['ids'], embeddings, products['documents'], products['metadatas'],
+                 normalized=True)
+
+    def _category_code(self, category: str) -> int:
+        return self._category_codes.setdefault(category, len(self._category_codes))
+
+    def _reserve(self, capacity: int, dim: int):
+        """Agrandit les tableaux par doublement pour amortir les ajouts."""
+        if self._matrix is not None and capacity <= len(self._matrix):
+            return
+        new_capacity = max(capacity, 2 * (0 if self._matrix is None else len(self._matrix)), 1024)
+
+        matrix = np.zeros((new_capacity, dim), dtype=self.dtype)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+        for name, dtype in (('_prices', np.float32), ('_ratings', np.float32),
+                            ('_main_codes', np.int32), ('_sub_codes', np.int32)):
+            column = np.zeros(new_capacity, dtype=dtype)
+            column[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, column)
+
+    def add(self, ids, embeddings, documents, metadatas, normalized: bool = False):
+        with self._lock:
+            if not len(ids):
+                return
+            embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+            if not normalized:
+                embeddings = normalize_rows(embeddings)
+
+            rows = []
+            new_rows: Dict[str, int] = {}
+            for product_id in ids:
+                row = self._row_by_id.get(product_id)
+                if row is None:
+                    row = new_rows.setdefault(product_id, self._size + len(new_rows))
+                rows.append(row)
+            new_count = len(new_rows)
+            self._reserve(self._size + new_count, embeddings.shape[1])
+
+            rows = np.asarray(rows)
+            self._matrix[rows] = embeddings
+            self._ids.extend(new_rows)
+            self._documents.extend([None] * new_count)
+            self._metadatas.extend([None] * new_count)
+            self._row_by_id.update(new_rows)
+            for row, document, metadata in zip(rows, documents, metadatas):
+                self._documents[row] = document
+                self._metadatas[row] = metadata
+                self._prices[row] = metadata.get('discount_price', 0.0)
+                self._ratings[row] = metadata.get('ratings', 0.0)
+                self._main_codes[row] = self._category_code(metadata.get('main_category', ''))
+                self._sub_codes[row] = self._category_code(metadata.get('sub_category', ''))
+            self._size += new_count
+
+    def get(self, ids):
+        with self._lock:
+            return {
+                product_id: self._metadatas[self._row_by_id[product_id]]
+                for product_id in ids if product_id in self._row_by_id
+            }
+
+    def delete(self, ids):
+        with self._lock:
+            for product_id in ids:
+                row = self._row_by_id.pop(product_id, None)
+                if row is None:
+                    continue
+                # Remplacer la ligne supprimée par la dernière pour garder la matrice contiguë
+                last = self._size - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    for name in ('_prices', '_ratings', '_main_codes', '_sub_codes'):
+                        column = getattr(self, name)
+                        column[row] = column[last]
+                    self._ids[row] = moved_id
+                    self._documents[row] = self._documents[last]
+                    self._metadatas[row] = self._metadatas[last]
+                    self._row_by_id[moved_id] = row
+                self._ids.pop()
+                self._documents.pop()
+                self._metadatas.pop()
+                self._size -= 1
+
+    def _candidate_rows(self, filters: Optional[dict]) -> Optional[np.ndarray]:
+        """Lignes respectant les contraintes, ou None si aucune contrainte."""
+        filters = filters or {}
+        size = self._size
+        mask = None
+
+        def restrict(condition):
+            nonlocal mask
+            mask = condition if mask is None else (mask & condition)
+
+        if filters.get('price_min') is not None:
+            restrict(self._prices[:size] >= float(filters['price_min']))
+        if filters.get('price_max') is not None:
+            restrict(self._prices[:size] <= float(filters['price_max']))
+        if filters.get('min_rating') is not None:
+            restrict(self._ratings[:size] >= float(filters['min_rating']))
+        for key, codes in (('main_categories', self._main_codes), ('sub_categories', self._sub_codes)):
+            if filters.get(key):
+                wanted = [self._category_codes[c] for c in filters[key] if c in self._category_codes]
+                restrict(np.isin(codes[:size], wanted))
+
+        return None if mask is None else np.flatnonzero(mask)
+
+    def query(self, embeddings, n_results, filters=None):
+        with self._lock:
+            queries = normalize_rows(embeddings)
+            if self._size == 0:
+                return [[] for _ in range(len(queries))]
+
+            rows = self._candidate_rows(filters)
+            n_candidates = self._size if rows is None else len(rows)
+            k = min(n_results, n_candidates)
+            if k == 0:
+                return [[] for _ in range(len(queries))]
+
+            # Similarités cosinus, calculées par blocs pour limiter la copie en float32
+            scores = np.empty((n_candidates, len(queries)), dtype=np.float32)
+            for start in range(0, n_candidates, self.BLOCK_SIZE):
+                end = min(start + self.BLOCK_SIZE, n_candidates)
+                block = self._matrix[start:end] if rows is None else self._matrix[rows[start:end]]
+                scores[start:end] = block.astype(np.float32, copy=False) @ queries.T
+
+            # Top-k de toutes les requêtes en une passe, puis tri des k meilleurs
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            results = []
+            for j in range(len(queries)):
+                candidates = top[:, j]
+                ordered = candidates[np.argsort(-scores[candidates, j])]
+                hits = []
+                for idx in ordered:
+                    row = int(idx) if rows is None else int(rows[idx])
+                    hits.append((self._ids[row], float(1.0 - scores[idx, j]), self._metadatas[row]))
+                results.append(hits)
+            return results
+
+    def persist(self):
+        with self._lock:
+            os.makedirs(self.persist_directory, exist_ok=True)
+            matrix = self._matrix[:self._size] if self._matrix is not None else np.empty((0, 0), self.dtype)
+
+            # Écriture atomique : fichiers temporaires puis renommage
+            embeddings_tmp = self._embeddings_path + '.tmp'
+            products_tmp = self._products_path + '.tmp'
+            with open(embeddings_tmp, 'wb') as f:
+                np.save(f, matrix)
+            with open(products_tmp, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'ids': self._ids,
+                    'documents': self._documents,
+                    'metadatas': self._metadatas
+                }, f, ensure_ascii=False)
+            os.replace(embeddings_tmp, self._embeddings_path)
+            os.replace(products_tmp, self._products_path)
+
+    def content_hashes(self):
+        with self._lock:
+            return {
+                product_id: metadata.get('content_hash')
+                for product_id, metadata in zip(self._ids, self._metadatas)
+            }
+
+    def __len__(self) -> int:
+        return self._size
+
+def create_vector_store(backend: str, persist_directory: Optional[str] = None,
+                        dtype: str = 'float32') -> VectorStore:
+    """Instancie le backend vectoriel choisi par la configuration."""
+    from .config import CHROMA_DB_PATH, NUMPY_INDEX_PATH
+
+    if backend == 'chroma':
+        return ChromaVectorStore(persist_directory or CHROMA_DB_PATH)
+    if backend == 'numpy':
+        return NumpyVectorStore(persist_directory or NUMPY_INDEX_PATH, dtype=dtype)
+    raise ValueError(f"Unknown vector backend: {backend}")
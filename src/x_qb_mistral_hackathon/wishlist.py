@@ -1,16 +1,189 @@
-wishlist = []
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from .config import WISHLIST_CACHE_USERS, WISHLIST_DB_PATH, WISHLIST_PAGE_SIZE, WISHLIST_TTL_DAYS
 
-def add_to_wishlist(item):
+class WishlistStore:
     """
-    Adds an item to the wishlist.
+    Per-user wishlists, persisted in SQLite and keyed by stable product IDs.
+
+    Each loaded list is an OrderedDict (product id -> item) in insertion
+    order, so add, remove and duplicate checks are constant time. The lists
+    of the `max_users` most recently active users stay in memory; the others
+    are reloaded from the database on their next access.
+
+    The last time each user was seen is stored (to within TOUCH_RESOLUTION
+    seconds), and the lists of users not seen for `ttl_days` are deleted when
+    the store is opened.
+    """
+
+    # Seconds between two writes of a user's last-seen time
+    TOUCH_RESOLUTION = 3600
+
+    def __init__(self, path: str = WISHLIST_DB_PATH, max_users: int = WISHLIST_CACHE_USERS,
+                 ttl_days: float = WISHLIST_TTL_DAYS):
+        self.path = path
+        self.max_users = max_users
+        self._lists: "OrderedDict[str, OrderedDict[str, dict]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS wishlist (
+                user_id TEXT NOT NULL,
+                product_id TEXT NOT NULL,
+                item TEXT NOT NULL,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (user_id, product_id)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_wishlist_user_added ON wishlist(user_id, added_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS wishlist_users (user_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+        )
+        # Lists saved before last-seen times were recorded: seen when last added to
+        self._conn.execute(
+            "INSERT OR IGNORE INTO wishlist_users (user_id, last_seen) "
+            "SELECT user_id, MAX(added_at) FROM wishlist GROUP BY user_id"
+        )
+        self._conn.commit()
+        if ttl_days > 0:
+            self.purge_expired(ttl_days)
+
+    def purge_expired(self, ttl_days: float) -> int:
+        """Delete the lists of users not seen for `ttl_days` days; returns the number of users."""
+        cutoff = time.time() - ttl_days * 86400
+        with self._lock:
+            with self._conn:
+                expired = [user_id for (user_id,) in self._conn.execute(
+                    "SELECT user_id FROM wishlist_users WHERE last_seen < ?", (cutoff,)
+                )]
+                self._conn.executemany("DELETE FROM wishlist WHERE user_id = ?", [(u,) for u in expired])
+                self._conn.executemany("DELETE FROM wishlist_users WHERE user_id = ?", [(u,) for u in expired])
+            for user_id in expired:
+                self._lists.pop(user_id, None)
+                self._touched.pop(user_id, None)
+        return len(expired)
+
+    def _touch(self, user_id: str):
+        """Record that the user was seen, at most once per TOUCH_RESOLUTION (lock held)."""
+        now = time.time()
+        if now - self._touched.get(user_id, 0.0) < self.TOUCH_RESOLUTION:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO wishlist_users (user_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (user_id, now)
+            )
+        self._touched[user_id] = now
+
+    def _user_list(self, user_id: str) -> "OrderedDict[str, dict]":
+        """The user's list, loaded from the database if it is not in memory (lock held)."""
+        self._touch(user_id)
+        items = self._lists.get(user_id)
+        if items is None:
+            rows = self._conn.execute(
+                "SELECT product_id, item FROM wishlist WHERE user_id = ? ORDER BY added_at, rowid", (user_id,)
+            ).fetchall()
+            items = OrderedDict((product_id, json.loads(item)) for product_id, item in rows)
+            self._lists[user_id] = items
+            if len(self._lists) > self.max_users:
+                evicted, _ = self._lists.popitem(last=False)
+                self._touched.pop(evicted, None)
+        else:
+            self._lists.move_to_end(user_id)
+        return items
+
+    def add(self, user_id: str, item: Dict) -> bool:
+        """Add a product (a dict with an 'id') to the user's list; False if it was already there."""
+        product_id = str(item['id'])
+        with self._lock:
+            items = self._user_list(user_id)
+            if product_id in items:
+                return False
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO wishlist (user_id, product_id, item, added_at) VALUES (?, ?, ?, ?)",
+                    (user_id, product_id, json.dumps(item, ensure_ascii=False, default=str), time.time())
+                )
+            items[product_id] = item
+            return True
+
+    def remove(self, user_id: str, product_id: str) -> bool:
+        """Remove a product from the user's list; False if it was not there."""
+        product_id = str(product_id)
+        with self._lock:
+            items = self._user_list(user_id)
+            if product_id not in items:
+                return False
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM wishlist WHERE user_id = ? AND product_id = ?", (user_id, product_id)
+                )
+            del items[product_id]
+            return True
+
+    def contains(self, user_id: str, product_id: str) -> bool:
+        with self._lock:
+            return str(product_id) in self._user_list(user_id)
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            return len(self._user_list(user_id))
+
+    def page(self, user_id: str, page: int = 0, page_size: int = WISHLIST_PAGE_SIZE) -> Tuple[List[dict], int]:
+        """Items of one page (oldest first) and the number of pages."""
+        with self._lock:
+            items = self._user_list(user_id)
+            pages = max((len(items) + page_size - 1) // page_size, 1)
+            page = min(max(page, 0), pages - 1)
+            return list(islice(items.values(), page * page_size, (page + 1) * page_size)), pages
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def format_wishlist_item(item: Dict) -> str:
+    """
+    Formats one wishlist item as Markdown.
+    """
+    text = f"**{item['name']}**\n{item.get('description', '')}\n**Prix**: {item['price']}"
+    if item.get('image'):
+        text += f"\n![Image]({item['image']})"
+    return text
+
+_default_store: Optional[WishlistStore] = None
+_default_store_lock = threading.Lock()
+
+def get_default_wishlist_store() -> WishlistStore:
+    """Store shared by all sessions of the process."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = WishlistStore()
+    return _default_store
+
+def add_to_wishlist(user_id, item):
+    """
+    Adds an item to the user's wishlist.
     """
-    wishlist.append(item)
+    return get_default_wishlist_store().add(user_id, item)
 
-def display_wishlist():
+def display_wishlist(user_id, page=0, page_size=WISHLIST_PAGE_SIZE):
     """
-    Displays all items in the wishlist as a Markdown string.
+    Displays one page of the user's wishlist as a Markdown string.
     """
-    results = []
-    for item in wishlist:
-        results.append(f"**{item['name']}**\n{item['description']}\n**Prix**: {item['price']}\n![Image]({item['image']})")
-    return "\n\n".join(results)
\ No newline at end of file
+    items, _ = get_default_wishlist_store().page(user_id, page, page_size)
+    return "\n\n".join(format_wishlist_item(item) for item in items)
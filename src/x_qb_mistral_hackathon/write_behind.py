@@ -0,0 +1,190 @@
+"""Background writers that keep disk I/O off the request path.
+
+`configure_logging` routes every log record through a bounded queue to the
+handlers of `LOGGING_CONFIG`, which run on a `QueueListener` thread.
+`WriteBehindQueue` batches arbitrary items (e.g. recommendation rows) and
+hands them to a flush function on its own thread, when a batch is full or
+after a time threshold, whichever comes first.
+"""
+import atexit
+import logging
+import logging.config
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .config import LOG_QUEUE_SIZE, LOGGING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller on low-severity records.
+
+    When the queue is full, records below WARNING are dropped (and counted);
+    warnings and errors wait up to `block_timeout` seconds for room.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                try:
+                    self.queue.put(record, timeout=self.block_timeout)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+def configure_logging(config: Dict = LOGGING_CONFIG, queue_size: int = LOG_QUEUE_SIZE) -> logging.handlers.QueueListener:
+    """Apply `config`, then move the root handlers behind a queue and a listener thread.
+
+    Idempotent: Streamlit re-executes the app script on every interaction,
+    and only the first call configures logging.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        logging.config.dictConfig(config)
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        log_queue = queue.Queue(maxsize=queue_size)
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(BoundedQueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_logging)
+        return _listener
+
+def _stop_logging():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            # Drains the queue before returning
+            _listener.stop()
+            _listener = None
+
+# Queued by close() behind the pending items
+_CLOSE = object()
+
+class WriteBehindQueue:
+    """Bounded queue flushed in batches by a background thread.
+
+    `submit` returns immediately while there is room. When the queue is full
+    it blocks the caller for at most `put_timeout` seconds (backpressure),
+    then drops the item and returns False. `close` flushes what is pending.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], Any], batch_size: int = 100,
+                 flush_interval: float = 1.0, max_pending: int = 10000, put_timeout: float = 0.5,
+                 name: str = "write-behind"):
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        # Guards `_closed`, `_putting` and the submit counters. It is not held
+        # during the timed put: close() waits for the puts in flight before
+        # queuing _CLOSE, so no item can be queued behind it
+        self._lock = threading.Lock()
+        self._puts_done = threading.Condition(self._lock)
+        self._closed = False
+        self._putting = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed_batches = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, item: Any) -> bool:
+        """Queue an item for the next batch; False if it was dropped."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._putting += 1
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+            accepted = True
+        except queue.Full:
+            accepted = False
+        with self._lock:
+            self._putting -= 1
+            if not self._putting:
+                self._puts_done.notify_all()
+            if accepted:
+                self.submitted += 1
+                return True
+            self.dropped += 1
+            dropped = self.dropped
+        logger.warning(f"Write-behind queue full, dropped one item ({dropped} so far)")
+        return False
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    self._write(batch)
+                    return
+                batch.append(item)
+                if deadline is None:
+                    # The first item of a batch waits at most flush_interval
+                    deadline = time.monotonic() + self.flush_interval
+            self._write(batch)
+
+    def _write(self, batch: List[Any]):
+        if not batch:
+            return
+        try:
+            self._flush(batch)
+            self.flushed += len(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Write-behind flush of {len(batch)} items failed: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting items, flush the pending ones and stop the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # Each put in flight ends within put_timeout
+            self._puts_done.wait_for(lambda: not self._putting)
+        try:
+            self._queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            logger.error(f"Write-behind queue did not drain, {self._queue.qsize()} items lost")
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Counters since creation and the current queue length."""
+        with self._lock:
+            return {
+                'pending': self._queue.qsize(),
+                'submitted': self.submitted,
+                'flushed': self.flushed,
+                'dropped': self.dropped,
+                'failed_batches': self.failed_batches
+            }
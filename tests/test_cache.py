@@ -0,0 +1,55 @@
+from x_qb_mistral_hackathon import cache
+from x_qb_mistral_hackathon.cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set('a', 1)
+
+    clock.now += 59
+    assert ttl_cache.get('a') == 1
+    clock.now += 2
+    assert ttl_cache.get('a', 'missing') == 'missing'
+    assert len(ttl_cache) == 0
+    assert ttl_cache.stats()['expirations'] == 1
+
+def test_set_refreshes_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    ttl_cache = TTLCache(maxsize=10, ttl=60)
+    ttl_cache.set('a', 1)
+    clock.now += 50
+    ttl_cache.set('a', 2)
+    clock.now += 50
+    assert ttl_cache.get('a') == 2
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set('a', 1)
+    ttl_cache.set('b', 2)
+    ttl_cache.get('a')
+    ttl_cache.set('c', 3)
+    assert ttl_cache.get('b') is None
+    assert ttl_cache.get('a') == 1 and ttl_cache.get('c') == 3
+    assert ttl_cache.stats()['evictions'] == 1
+
+def test_stats_count_hits_and_misses():
+    ttl_cache = TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set('a', 1)
+    ttl_cache.get('a')
+    ttl_cache.get('b')
+    stats = ttl_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+def test_zero_size_cache_stores_nothing():
+    ttl_cache = TTLCache(maxsize=0)
+    ttl_cache.set('a', 1)
+    assert ttl_cache.get('a') is None
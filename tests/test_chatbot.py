@@ -0,0 +1,70 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from x_qb_mistral_hackathon.chatbot import GiftChatbot
+from x_qb_mistral_hackathon.llm_cache import LLMCache
+
+class FakeClient:
+    """Client Mistral qui renvoie les réponses prévues, dans l'ordre."""
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.calls = []
+        self.chat = self
+
+    def complete(self, model, messages, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.contents.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class FakeRAGEngine:
+    """Renvoie un produit différent selon la personne décrite dans la requête."""
+
+    def __init__(self):
+        self.queries = []
+
+    def find_similar_products(self, query, **filters):
+        self.queries.append(query)
+        product_id = 'frere' if 'frère' in query else 'mere'
+        return [{'id': product_id, 'name': f"Cadeau {product_id}"}]
+
+def _structured(description, interests="jardinage"):
+    return json.dumps({
+        'reply': "Voici une idée.",
+        'preferences': {'description': description, 'interests': interests}
+    })
+
+def _chatbot(*contents):
+    chatbot = GiftChatbot(single_call=True, use_llm_cache=False)
+    chatbot.client = FakeClient(*contents)
+    chatbot.set_rag_engine(FakeRAGEngine())
+    chatbot.current_preferences = {'description': "ma mère", 'interests': "jardinage"}
+    return chatbot
+
+def test_description_change_triggers_a_new_search():
+    chatbot = _chatbot(_structured("mon frère"), "Recommandations pour ton frère")
+    response = chatbot.get_response([{'role': 'user', 'content': "En fait c'est pour mon frère"}])
+    assert response == "Recommandations pour ton frère"
+    assert len(chatbot.rag_engine.queries) == 2
+    assert [p['id'] for p in chatbot.last_recommendations] == ['frere']
+
+def test_reworded_preferences_keep_the_products():
+    chatbot = _chatbot(_structured("Ma  Mère", "Jardinage"))
+    response = chatbot.get_response([{'role': 'user', 'content': "Elle adore le jardinage"}])
+    assert response == "Voici une idée."
+    assert len(chatbot.rag_engine.queries) == 1
+    assert len(chatbot.client.calls) == 1
+
+@pytest.mark.parametrize('cache_generations, expected', [(False, ["Premier.", "Second."]), (True, ["Premier.", "Premier."])])
+def test_structured_reply_is_cached_only_with_generations(tmp_path, cache_generations, expected):
+    chatbot = GiftChatbot(single_call=True, llm_cache=LLMCache(str(tmp_path / 'cache.sqlite')))
+    chatbot.cache_generations = cache_generations
+    chatbot.client = FakeClient(*[json.dumps({'reply': reply, 'preferences': {}}) for reply in ("Premier.", "Second.")])
+    messages = [{'role': 'user', 'content': "Un cadeau pour ma mère"}]
+    replies = []
+    for _ in range(2):
+        chatbot.current_preferences = {}
+        replies.append(chatbot.get_response(messages))
+    assert replies == expected
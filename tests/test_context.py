@@ -0,0 +1,48 @@
+from x_qb_mistral_hackathon.context import ConversationContext
+
+SYSTEM = {'role': 'system', 'content': 'Tu es un assistant.'}
+
+def _conversation(turns, length=20):
+    messages = [SYSTEM]
+    for turn in range(turns):
+        messages.append({'role': 'user', 'content': f"question {turn:03d} " + 'x' * length})
+        messages.append({'role': 'assistant', 'content': f"réponse {turn:03d} " + 'y' * length})
+    return messages
+
+def test_short_conversation_is_sent_unchanged():
+    messages = _conversation(2)
+    assert ConversationContext(max_turns=4, token_budget=3000).build(messages) == messages
+
+def test_old_turns_are_replaced_by_a_summary():
+    messages = _conversation(10)
+    built = ConversationContext(max_turns=2, token_budget=3000).build(messages, {'interests': 'jardinage', 'gift_type': ''})
+    assert built[0] == SYSTEM
+    assert built[1]['role'] == 'system' and 'jardinage' in built[1]['content']
+    assert 'gift_type' not in built[1]['content']
+    assert built[2:] == messages[-4:]
+
+def test_no_summary_without_known_preferences():
+    messages = _conversation(10)
+    built = ConversationContext(max_turns=2, token_budget=3000).build(messages)
+    assert built == [SYSTEM] + messages[-4:]
+
+def test_token_budget_drops_oldest_turns_but_keeps_last_message():
+    messages = _conversation(4, length=400)
+    context = ConversationContext(max_turns=4, token_budget=300)
+    built = context.build(messages)
+    assert context.estimate_tokens(built) <= 300 or built[1:] == messages[-1:]
+    assert built[-1] == messages[-1]
+    assert built[1]['role'] == 'user'
+
+def test_prompt_size_stays_flat_for_long_conversations():
+    context = ConversationContext(max_turns=3, token_budget=3000)
+    preferences = {'interests': 'musique'}
+    sizes = [context.estimate_tokens(context.build(_conversation(turns), preferences)) for turns in (5, 50, 500)]
+    assert sizes[0] == sizes[1] == sizes[2]
+
+def test_extraction_input_keeps_recent_user_messages():
+    messages = _conversation(6)
+    text = ConversationContext(max_turns=2, token_budget=3000).extraction_input(messages, {'interests': 'cuisine'})
+    lines = text.split('\n')
+    assert 'cuisine' in lines[0]
+    assert lines[1:] == [messages[-4]['content'], messages[-2]['content']]
@@ -0,0 +1,113 @@
+import math
+import random
+
+import pytest
+
+from x_qb_mistral_hackathon.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCUMENTS = {
+    'p1': "Livre de cuisine italienne - Livres - Recettes de pâtes et de pizzas",
+    'p2': "Montre connectée - Montres - Suivi sportif et notifications",
+    'p3': "Coffret thé vert - Épicerie - Thés du Japon",
+    'p4': "Tablier de cuisine - Maison - Tablier en lin pour la cuisine",
+    'p5': "Jeu de société - Jeux - Jeu de stratégie pour toute la famille"
+}
+
+@pytest.fixture
+def index():
+    index = BM25Index(max_df_ratio=1.0)
+    for doc_id, text in DOCUMENTS.items():
+        index.add(doc_id, text)
+    return index
+
+def _exhaustive_scores(index, query):
+    """Scores BM25 de tous les documents, sans élagage."""
+    n_docs = len(index)
+    avg_length = sum(index._doc_lengths.values()) / n_docs
+    scores = {}
+    for term in set(tokenize(query)):
+        postings = index._postings.get(term, {})
+        if not postings or len(postings) > max(1, int(index.max_df_ratio * n_docs)):
+            continue
+        idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc_id, tf in postings.items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + index._weight(idf, tf, index._doc_lengths[doc_id], avg_length)
+    return scores
+
+def test_tokenize_removes_accents_case_and_stopwords():
+    assert tokenize("Le Thé VERT du Japon, épicé!") == ['vert', 'japon', 'epice']
+
+def test_search_ranks_by_bm25(index):
+    hits = index.search("cuisine", k=5)
+    # Deux occurrences dans un texte de longueur comparable
+    assert [doc_id for doc_id, _ in hits] == ['p4', 'p1']
+    assert hits[0][1] > hits[1][1] > 0
+
+def test_search_matches_accent_insensitive_terms(index):
+    assert index.search("thes epicerie", k=1)[0][0] == 'p3'
+
+def test_search_without_results_requested(index):
+    assert index.search("cuisine", k=0) == []
+
+def test_frequent_terms_are_skipped():
+    index = BM25Index(max_df_ratio=0.5)
+    for doc_id, text in DOCUMENTS.items():
+        index.add(doc_id, text + " cadeau original")
+    assert index.search("original", k=5) == []
+    assert index.search("original montre", k=5)[0][0] == 'p2'
+
+def test_add_replaces_and_remove_deletes(index):
+    index.add('p2', "Montre de plongée - Montres - Étanche à 200 mètres")
+    assert index.search("sportif", k=5) == []
+    assert index.search("plongee", k=5)[0][0] == 'p2'
+    index.remove('p2')
+    assert index.search("montre", k=5) == []
+    assert sorted(index.doc_ids()) == ['p1', 'p3', 'p4', 'p5']
+
+def test_unchanged_text_is_not_reindexed(index):
+    index.dirty = False
+    index.add('p1', DOCUMENTS['p1'])
+    assert not index.dirty
+
+def test_pruned_search_matches_exhaustive_scoring():
+    rng = random.Random(0)
+    vocabulary = [f"mot{i}" for i in range(300)]
+    index = BM25Index()
+    for doc in range(2000):
+        # Distribution de Zipf : quelques termes fréquents, beaucoup de termes rares
+        words = rng.choices(vocabulary, weights=[1 / (i + 1) for i in range(300)], k=rng.randint(3, 30))
+        index.add(f"d{doc}", " ".join(words))
+    for doc in range(0, 2000, 7):
+        index.remove(f"d{doc}")
+
+    for _ in range(200):
+        query = " ".join(rng.sample(vocabulary, rng.randint(1, 5)))
+        expected = sorted(_exhaustive_scores(index, query).values(), reverse=True)
+        for k in (1, 10, 100):
+            scores = [score for _, score in index.search(query, k)]
+            assert scores == pytest.approx(expected[:k])
+
+def test_save_and_load(index, tmp_path):
+    path = str(tmp_path / 'bm25.json')
+    index.save(path)
+    assert not index.dirty
+    reloaded = BM25Index.load(path, max_df_ratio=1.0)
+    assert reloaded.fingerprint() == index.fingerprint()
+    assert reloaded.search("cuisine tablier", k=5) == index.search("cuisine tablier", k=5)
+
+    # Les textes inchangés ne sont pas ré-indexés après rechargement
+    for doc_id, text in DOCUMENTS.items():
+        reloaded.add(doc_id, text)
+    assert not reloaded.dirty
+
+def test_load_rejects_missing_or_modified_files(index, tmp_path):
+    path = tmp_path / 'bm25.json'
+    assert BM25Index.load(str(path)) is None
+    index.save(str(path))
+    path.write_text(path.read_text().replace('"p5"', '"p6"'))
+    assert BM25Index.load(str(path)) is None
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([['b', 'a'], ['c', 'b', 'd']], k=60)
+    assert fused == ['b', 'c', 'a', 'd']
+    assert reciprocal_rank_fusion([['a', 'b'], ['b']], limit=1) == ['b']
@@ -0,0 +1,37 @@
+import numpy as np
+
+from x_qb_mistral_hackathon.rag_engine import RAGEngine
+from x_qb_mistral_hackathon.vector_store import NumpyVectorStore
+
+class FakeEmbeddingModel:
+    def encode(self, text):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+def _metadata(name, price):
+    return {
+        'content_hash': name,
+        'name': name,
+        'gift_category': 'Books',
+        'rich_description': '',
+        'discount_price': price,
+        'ratings': 4.0,
+        'main_category': 'Books',
+        'sub_category': 'Novels'
+    }
+
+def _engine(tmp_path):
+    engine = RAGEngine(store=NumpyVectorStore(str(tmp_path / 'index')), hybrid_search=True, reranker=None)
+    engine._embedding_model = FakeEmbeddingModel()
+    engine.store.add(['book', 'atlas'], np.array([[1.0, 0.0], [0.0, 1.0]]), ['', ''],
+                     [_metadata('book', 20.0), _metadata('atlas', 60.0)])
+    engine.lexical_index.add('book', "Roman policier")
+    engine.lexical_index.add('atlas', "Atlas du monde")
+    return engine
+
+def test_hybrid_search_fuses_vector_and_lexical_hits(tmp_path):
+    products = _engine(tmp_path).find_similar_products("atlas", n_results=2)
+    assert {product['id'] for product in products} == {'book', 'atlas'}
+
+def test_hybrid_search_without_matching_products(tmp_path, capsys):
+    assert _engine(tmp_path).find_similar_products("atlas", price_min=1000) == []
+    assert "Erreur" not in capsys.readouterr().out
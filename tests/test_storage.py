@@ -0,0 +1,75 @@
+import csv
+
+import pytest
+
+from x_qb_mistral_hackathon.storage import RECOMMENDATION_FIELDS, BufferedDataStorage, DataStorage
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = DataStorage(str(tmp_path / 'recommendations.sqlite'), csv_path=None)
+    rows = [
+        ('2026-01-01 10:00:00', 'alice', 'livres'),
+        ('2026-01-02 10:00:00', 'bob', 'montres'),
+        ('2026-01-03 10:00:00', 'alice', 'thé'),
+        ('2026-01-04 10:00:00', 'alice', 'jeux'),
+        ('2026-01-05 10:00:00', 'bob', 'cuisine')
+    ]
+    with storage._conn:
+        storage._conn.executemany(
+            "INSERT INTO recommendations (timestamp, user_id, interests) VALUES (?, ?, ?)", rows
+        )
+    yield storage
+    storage.close()
+
+def _interests(rows):
+    return [row['interests'] for row in rows]
+
+def test_save_and_read_back(tmp_path):
+    storage = DataStorage(str(tmp_path / 'recommendations.sqlite'), csv_path=None)
+    assert storage.save_recommendation({'user_id': 'carol', 'gift_type': 'livre', 'interests': None})
+    [row] = storage.get_recommendations()
+    assert list(row) == RECOMMENDATION_FIELDS
+    assert (row['user_id'], row['gift_type'], row['interests']) == ('carol', 'livre', '')
+    storage.close()
+
+def test_filter_by_user_and_time_range(storage):
+    assert _interests(storage.get_recommendations(user_id='alice')) == ['livres', 'thé', 'jeux']
+    assert _interests(storage.get_recommendations(since='2026-01-02 10:00:00', until='2026-01-04 10:00:00')) == [
+        'montres', 'thé', 'jeux'
+    ]
+    assert _interests(storage.get_recommendations(user_id='bob', since='2026-01-03 00:00:00')) == ['cuisine']
+    assert storage.count_recommendations(user_id='alice', until='2026-01-03 10:00:00') == 2
+
+def test_pagination(storage):
+    assert _interests(storage.get_recommendations(limit=2)) == ['livres', 'montres']
+    assert _interests(storage.get_recommendations(limit=2, offset=2)) == ['thé', 'jeux']
+    assert _interests(storage.get_recommendations(offset=4)) == ['cuisine']
+    assert _interests(storage.get_recommendations(user_id='alice', limit=2, newest_first=True)) == ['jeux', 'thé']
+    assert storage.count_recommendations() == 5
+
+def test_csv_is_migrated_once(tmp_path):
+    csv_path = tmp_path / 'recommendations.csv'
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RECOMMENDATION_FIELDS)
+        writer.writeheader()
+        writer.writerow({'timestamp': '2025-12-31 23:59:59', 'user_id': 'dave', 'interests': 'vélo'})
+
+    db_path = str(tmp_path / 'recommendations.sqlite')
+    DataStorage(db_path, str(csv_path)).close()
+    storage = DataStorage(db_path, str(csv_path))
+    rows = storage.get_recommendations()
+    assert [(row['timestamp'], row['user_id'], row['interests']) for row in rows] == [
+        ('2025-12-31 23:59:59', 'dave', 'vélo')
+    ]
+    storage.close()
+
+def test_buffered_storage_flushes_on_close(tmp_path):
+    db_path = str(tmp_path / 'recommendations.sqlite')
+    storage = BufferedDataStorage(db_path, csv_path=None, batch_size=100, flush_interval=60)
+    for i in range(3):
+        assert storage.save_recommendation({'user_id': 'erin', 'interests': str(i)})
+    storage.close()
+
+    reader = DataStorage(db_path, csv_path=None)
+    assert _interests(reader.get_recommendations(user_id='erin')) == ['0', '1', '2']
+    reader.close()
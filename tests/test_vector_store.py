@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from x_qb_mistral_hackathon.vector_store import ChromaVectorStore, NumpyVectorStore, VectorStore, matches_filters
+
+def _metadata(name, price, rating, main, sub):
+    return {
+        'content_hash': name,
+        'name': name,
+        'gift_category': main,
+        'rich_description': '',
+        'discount_price': price,
+        'ratings': rating,
+        'main_category': main,
+        'sub_category': sub
+    }
+
+PRODUCTS = {
+    'book': ([1.0, 0.0, 0.0], _metadata('book', 20.0, 4.5, 'Books', 'Novels')),
+    'watch': ([0.0, 1.0, 0.0], _metadata('watch', 150.0, 4.0, 'Jewelry', 'Watches')),
+    'lamp': ([0.0, 0.0, 1.0], _metadata('lamp', 45.0, 3.5, 'Home', 'Lighting')),
+    'atlas': ([0.9, 0.1, 0.0], _metadata('atlas', 60.0, 4.8, 'Books', 'Travel'))
+}
+
+@pytest.fixture
+def store(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / 'index'))
+    ids = list(PRODUCTS)
+    store.add(ids, np.array([PRODUCTS[i][0] for i in ids]), [''] * len(ids), [PRODUCTS[i][1] for i in ids])
+    return store
+
+def _ids(hits):
+    return [product_id for product_id, _, _ in hits]
+
+def test_vector_store_is_abstract():
+    with pytest.raises(TypeError):
+        VectorStore()
+
+def test_query_ranks_by_cosine_distance(store):
+    hits = store.query(np.array([[2.0, 0.0, 0.0]]), 2)[0]
+    assert _ids(hits) == ['book', 'atlas']
+    assert hits[0][1] == pytest.approx(0.0, abs=1e-6)
+    assert hits[1][1] == pytest.approx(1 - 0.9 / np.hypot(0.9, 0.1), abs=1e-6)
+
+def test_query_applies_filters(store):
+    query = np.array([[1.0, 0.0, 0.0]])
+    assert _ids(store.query(query, 4, {'price_max': 50.0})[0]) == ['book', 'lamp']
+    assert _ids(store.query(query, 4, {'main_categories': ['Books'], 'min_rating': 4.6})[0]) == ['atlas']
+    assert _ids(store.query(query, 4, {'sub_categories': ['Watches'], 'price_min': 100})[0]) == ['watch']
+    assert store.query(query, 4, {'price_min': 1000})[0] == []
+
+def test_add_replaces_existing_product(store):
+    store.add(['book'], np.array([[0.0, 1.0, 0.0]]), [''], [_metadata('book', 25.0, 4.5, 'Books', 'Novels')])
+    assert len(store) == 4
+    assert set(_ids(store.query(np.array([[0.0, 1.0, 0.0]]), 2)[0])) == {'watch', 'book'}
+    assert store.get(['book'])['book']['discount_price'] == 25.0
+
+def test_delete_removes_products(store):
+    store.delete(['book', 'missing'])
+    assert len(store) == 3
+    assert 'book' not in _ids(store.query(np.array([[1.0, 0.0, 0.0]]), 4)[0])
+    assert store.get(['book']) == {}
+
+def test_persist_and_reload(store, tmp_path):
+    store.delete(['lamp'])
+    store.persist()
+    reloaded = NumpyVectorStore(str(tmp_path / 'index'))
+    assert reloaded.content_hashes() == {'book': 'book', 'watch': 'watch', 'atlas': 'atlas'}
+    query = np.array([[1.0, 0.0, 0.0]])
+    assert reloaded.query(query, 3) == store.query(query, 3)
+
+def test_chroma_where_clause():
+    assert ChromaVectorStore._build_where(None) is None
+    assert ChromaVectorStore._build_where({'price_max': 50}) == {'discount_price': {'$lte': 50.0}}
+    assert ChromaVectorStore._build_where({
+        'price_min': 10, 'main_categories': ['Books', 'Home', 'Books'], 'min_rating': 4
+    }) == {'$and': [
+        {'discount_price': {'$gte': 10.0}},
+        {'main_category': {'$in': ['Books', 'Home']}},
+        {'ratings': {'$gte': 4.0}}
+    ]}
+
+def test_matches_filters():
+    metadata = PRODUCTS['watch'][1]
+    assert matches_filters(metadata, None)
+    assert matches_filters(metadata, {'price_min': 150.0, 'price_max': 150.0})
+    assert not matches_filters(metadata, {'main_categories': ['Books']})
+    assert not matches_filters(metadata, {'min_rating': 4.1})
@@ -0,0 +1,97 @@
+import sqlite3
+import time
+
+import pytest
+
+from x_qb_mistral_hackathon.wishlist import WishlistStore, format_wishlist_item
+
+def _item(product_id, name=None):
+    return {'id': product_id, 'name': name or f"Produit {product_id}", 'price': 10.0, 'description': ''}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'wishlist.sqlite')
+
+def test_duplicates_are_ignored(path):
+    store = WishlistStore(path)
+    assert store.add('alice', _item('p1'))
+    assert not store.add('alice', _item('p1', name="Renamed"))
+    assert store.add('bob', _item('p1'))
+    assert store.count('alice') == 1
+    assert store.page('alice')[0][0]['name'] == "Produit p1"
+    store.close()
+
+def test_remove_and_contains(path):
+    store = WishlistStore(path)
+    store.add('alice', _item('p1'))
+    assert store.contains('alice', 'p1')
+    assert store.remove('alice', 'p1')
+    assert not store.remove('alice', 'p1')
+    assert not store.contains('alice', 'p1')
+    store.close()
+
+def test_pages_keep_insertion_order(path):
+    store = WishlistStore(path)
+    for i in range(7):
+        store.add('alice', _item(f"p{i}"))
+    items, pages = store.page('alice', page=1, page_size=3)
+    assert pages == 3
+    assert [item['id'] for item in items] == ['p3', 'p4', 'p5']
+    # Past the last page: the last page is returned
+    assert [item['id'] for item in store.page('alice', page=10, page_size=3)[0]] == ['p6']
+    assert store.page('nobody') == ([], 1)
+    store.close()
+
+def test_evicted_lists_are_reloaded_from_the_database(path):
+    store = WishlistStore(path, max_users=1)
+    store.add('alice', _item('p1'))
+    store.add('alice', _item('p2'))
+    store.add('bob', _item('p3'))
+    assert list(store._lists) == ['bob']
+
+    assert not store.add('alice', _item('p1'))
+    assert [item['id'] for item in store.page('alice')[0]] == ['p1', 'p2']
+    assert list(store._lists) == ['alice']
+    store.close()
+
+def test_lists_survive_a_restart(path):
+    store = WishlistStore(path)
+    store.add('alice', _item('p1'))
+    store.add('alice', _item('p2'))
+    store.remove('alice', 'p1')
+    store.close()
+
+    reopened = WishlistStore(path)
+    assert [item['id'] for item in reopened.page('alice')[0]] == ['p2']
+    reopened.close()
+
+def test_lists_of_idle_users_expire(path):
+    store = WishlistStore(path)
+    store.add('alice', _item('p1'))
+    store.add('bob', _item('p2'))
+    store.close()
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE wishlist_users SET last_seen = ? WHERE user_id = 'alice'", (time.time() - 100 * 86400,))
+
+    reopened = WishlistStore(path, ttl_days=90)
+    assert reopened.count('alice') == 0
+    assert reopened.count('bob') == 1
+    reopened.close()
+
+def test_expiry_can_be_disabled(path):
+    store = WishlistStore(path)
+    store.add('alice', _item('p1'))
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE wishlist_users SET last_seen = 0")
+
+    reopened = WishlistStore(path, ttl_days=0)
+    assert reopened.count('alice') == 1
+    reopened.close()
+
+def test_format_wishlist_item():
+    text = format_wishlist_item(dict(_item('p1'), image='https://example.com/p1.jpg'))
+    assert text.startswith("**Produit p1**")
+    assert "**Prix**: 10.0" in text
+    assert "![Image](https://example.com/p1.jpg)" in text
@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+import time
+
+from x_qb_mistral_hackathon.write_behind import BoundedQueueHandler, WriteBehindQueue
+
+class Recorder:
+    """Flush function that records each batch and signals its arrival."""
+
+    def __init__(self):
+        self.batches = []
+        self.flushed = threading.Event()
+
+    def __call__(self, batch):
+        self.batches.append((time.monotonic(), list(batch)))
+        self.flushed.set()
+
+def test_flushes_when_batch_is_full():
+    recorder = Recorder()
+    writer = WriteBehindQueue(recorder, batch_size=3, flush_interval=60)
+    submitted_at = time.monotonic()
+    for i in range(3):
+        assert writer.submit(i)
+    assert recorder.flushed.wait(5)
+    flushed_at, batch = recorder.batches[0]
+    assert batch == [0, 1, 2]
+    assert flushed_at - submitted_at < 5
+    writer.close()
+
+def test_flushes_partial_batch_after_interval():
+    recorder = Recorder()
+    writer = WriteBehindQueue(recorder, batch_size=100, flush_interval=0.2)
+    submitted_at = time.monotonic()
+    writer.submit('a')
+    writer.submit('b')
+    assert recorder.flushed.wait(5)
+    flushed_at, batch = recorder.batches[0]
+    assert batch == ['a', 'b']
+    assert flushed_at - submitted_at >= 0.15
+    writer.close()
+
+def test_close_flushes_pending_items_and_rejects_new_ones():
+    recorder = Recorder()
+    writer = WriteBehindQueue(recorder, batch_size=100, flush_interval=60)
+    for i in range(5):
+        writer.submit(i)
+    writer.close()
+    assert [item for _, batch in recorder.batches for item in batch] == list(range(5))
+    assert not writer.submit(5)
+    assert writer.stats()['submitted'] == writer.stats()['flushed'] == 5
+
+def test_no_item_is_lost_when_closing_during_submits():
+    items = []
+    writer = WriteBehindQueue(items.extend, batch_size=50, flush_interval=0.01)
+    accepted = []
+
+    def produce(worker):
+        accepted.append(sum(writer.submit((worker, i)) for i in range(2000)))
+
+    threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+    writer.close()
+    for thread in threads:
+        thread.join()
+
+    stats = writer.stats()
+    assert len(items) == sum(accepted) == stats['submitted'] == stats['flushed']
+
+def test_full_queue_drops_items_after_timeout():
+    release = threading.Event()
+    writer = WriteBehindQueue(lambda batch: release.wait(5), batch_size=1, flush_interval=60,
+                              max_pending=1, put_timeout=0.05)
+    writer.submit(0)
+    # The first item is being written, the second one fills the queue
+    time.sleep(0.1)
+    writer.submit(1)
+    assert not writer.submit(2)
+    assert writer.stats()['dropped'] == 1
+    release.set()
+    writer.close()
+
+def test_blocked_submit_does_not_hold_the_lock():
+    release = threading.Event()
+    writer = WriteBehindQueue(lambda batch: release.wait(5), batch_size=1, flush_interval=60,
+                              max_pending=1, put_timeout=2)
+    writer.submit(0)
+    time.sleep(0.1)
+    writer.submit(1)
+    # The queue is full: this submit waits for room
+    blocked = threading.Thread(target=writer.submit, args=(2,))
+    blocked.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    assert writer.stats()['pending'] == 1
+    assert time.monotonic() - started < 0.5
+    release.set()
+    blocked.join()
+    writer.close()
+    assert writer.stats()['submitted'] == writer.stats()['flushed'] == 3
+
+def test_failed_flush_is_counted():
+    def fail(batch):
+        raise OSError("disk full")
+
+    writer = WriteBehindQueue(fail, batch_size=1, flush_interval=60)
+    writer.submit(0)
+    writer.close()
+    assert writer.stats()['failed_batches'] == 1
+
+def test_bounded_queue_handler_drops_low_severity_records_when_full():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_timeout=0.01)
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, "message", None, None)
+    handler.enqueue(record)
+    handler.enqueue(record)
+    assert handler.dropped == 1